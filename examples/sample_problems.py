@@ -34,6 +34,8 @@ r, s, t, u, v, w, x, y, z = Vars('r, s, t, u, v, w, x, y, z')
 eps = Var('eps')
 
 f = Func('f')
+g = Func('g')
+h = Func('h')
 
 examples = list()
 
@@ -598,6 +600,23 @@ examples.append(Example(
     omit=True
 ))
 
+#
+# interactions between modules
+#
+
+examples.append(Example(
+    axioms=[Forall([x], g(f(x)) > 0), Forall([x], f(x) == c)],
+    hyps=[g(c) < 0],
+    terms=[f(a)],
+    comment='f(a) = c is only learned while the axiom module is running.'
+))
+
+examples.append(Example(
+    axioms=[Forall([x], Implies(x > 0, And(f(x) < 0, g(x) < 0, h(x) < 0)))],
+    hyps=[0 < d, 0 < e, f(d + e) + g(d + e) + h(d + e) > 0],
+    comment='The additive module has to run again on what its own d + e > 0 implies.'
+))
+
 
 ####################################################################################################
 #
@@ -48,6 +48,82 @@ class Error(Exception):
     pass
 
 
+inequality_comps = frozenset([terms.LT, terms.LE, terms.GE, terms.GT])
+weak_comps = frozenset([terms.LE, terms.GE])
+reflexive_comps = frozenset([terms.LE, terms.GE, terms.EQ])
+
+# the sign, and weak sign, of ti given the comp of ti with 0
+comp_sign = {terms.GT: 1, terms.LT: -1}
+comp_weak_sign = {terms.GT: 1, terms.GE: 1, terms.LT: -1, terms.LE: -1}
+
+# pairs (comp1, comp2) such that ti comp1 0 implies ti comp2 0, for comp1 an inequality
+zero_comp_implications = frozenset([
+    (terms.LT, terms.LT), (terms.LT, terms.LE), (terms.LT, terms.NE), (terms.LE, terms.LE),
+    (terms.GT, terms.GT), (terms.GT, terms.GE), (terms.GT, terms.NE), (terms.GE, terms.GE)
+])
+
+# For each inequality comp, the parameters (a, b, strong) of the Halfplanes that represent
+# ti comp 0 in the table for (ti, tj), first for i < j and then for i > j.
+# Halfplanes are mutable, so a new one is built from these each time.
+zero_halfplane_params = {
+    terms.GT: ((0, -1, True), (1, 0, True)),
+    terms.GE: ((0, -1, False), (1, 0, False)),
+    terms.LT: ((0, 1, True), (-1, 0, True)),
+    terms.LE: ((0, 1, False), (-1, 0, False))
+}
+
+
+# For each comp, the Halfplanes used by get_halfplane_comparisons to represent ti comp 0 and
+# tj comp 0 as comparisons between ti and tj. These are shared, and must not be modified.
+zero_halfplanes_first = {
+    terms.GT: geometry.Halfplane(0, -1, True),
+    terms.GE: geometry.Halfplane(0, -1, False),
+    terms.LT: geometry.Halfplane(0, 1, True),
+    terms.LE: geometry.Halfplane(0, 1, False)
+}
+zero_halfplanes_second = {
+    terms.GT: geometry.Halfplane(-1, 0, True),
+    terms.GE: geometry.Halfplane(-1, 0, False),
+    terms.LT: geometry.Halfplane(1, 0, True),
+    terms.LE: geometry.Halfplane(1, 0, False)
+}
+
+# Maps (le, comp) to the range of c for which 0 <= c * tj (if le) or 0 >= c * tj (otherwise) is
+# known, given tj comp 0.
+zero_ranges = {
+    (True, terms.GT): geometry.ComparisonRange(geometry.Extended(0), geometry.infty,
+                                               False, True, True),
+    (True, terms.GE): geometry.ComparisonRange(geometry.Extended(0), geometry.infty,
+                                               False, False, False),
+    (True, terms.LE): geometry.ComparisonRange(geometry.neg_infty, geometry.Extended(0),
+                                               False, False, False),
+    (True, terms.LT): geometry.ComparisonRange(geometry.neg_infty, geometry.Extended(0),
+                                               False, True, True),
+    (False, terms.GT): geometry.ComparisonRange(geometry.neg_infty, geometry.Extended(0),
+                                                True, True, False),
+    (False, terms.GE): geometry.ComparisonRange(geometry.neg_infty, geometry.Extended(0),
+                                                False, False, False),
+    (False, terms.LE): geometry.ComparisonRange(geometry.Extended(0), geometry.infty,
+                                                False, False, False),
+    (False, terms.LT): geometry.ComparisonRange(geometry.Extended(0), geometry.infty,
+                                                True, True, False)
+}
+
+# Maps (comp, coeff == 0) to the method that asserts ti comp coeff * tj.
+assert_handlers = {
+    (terms.EQ, True): lambda B, i, comp, coeff, j: B.assert_zero_equality(i),
+    (terms.EQ, False): lambda B, i, comp, coeff, j: B.assert_equality(i, coeff, j),
+    (terms.NE, True): lambda B, i, comp, coeff, j: B.assert_zero_disequality(i),
+    (terms.NE, False): lambda B, i, comp, coeff, j: B.assert_disequality(i, coeff, j)
+}
+assert_handlers.update(
+    ((comp, True), lambda B, i, comp, coeff, j: B.assert_zero_inequality(i, comp))
+    for comp in inequality_comps)
+assert_handlers.update(
+    ((comp, False), lambda B, i, comp, coeff, j: B.assert_inequality(i, comp, coeff, j))
+    for comp in inequality_comps)
+
+
 ####################################################################################################
 #
 # Blackboard
@@ -64,34 +140,45 @@ class Tracker(object):
 
     def __init__(self, bb):
         self.m_index = 0
-        self.updates = {}
         self.bb = bb
+        self.history = set(bb.zero_inequalities)  # all keys that have carried information
+
+        # Updates are numbered by epoch. log[k] holds the key of update number log_start + k + 1,
+        # and last_seen maps each module to the last epoch it has been told about.
+        self.epoch = 0
+        self.log = []
+        self.log_start = 0
+        self.last_seen = {}
 
     def has_new_info(self, module):
-        if module in self.updates:
-            return len(self.updates[module]) > 0
+        if module in self.last_seen:
+            return self.last_seen[module] < self.epoch
         else:
             return True
 
     def get_new_info(self, module):
-        if module in self.updates:
-            s = self.updates[module]
-            self.updates[module] = set()
-            return s
+        if module in self.last_seen:
+            s = set(self.log[self.last_seen[module] - self.log_start:])
         else:
-            s = set(self.bb.inequalities.keys() + self.bb.disequalities.keys()
-                    + self.bb.equalities.keys() + self.bb.zero_inequalities.keys()
-                    + list(self.bb.zero_equalities.union(self.bb.zero_disequalities)))
-            self.updates[module] = set()
-            return s
+            s = set(self.history)
+        self.last_seen[module] = self.epoch
+
+        # Forget the updates every module has seen. Modules that start later use the history.
+        low = min(self.last_seen.itervalues())
+        if low > self.log_start:
+            del self.log[:low - self.log_start]
+            self.log_start = low
+        return s
 
     def identify(self):
         self.m_index += 1
         return self.m_index - 1
 
     def update(self, key):
-        for k in self.updates:
-            self.updates[k].add(key)
+        self.bb.revision += 1
+        self.history.add(key)
+        self.epoch += 1
+        self.log.append(key)
 
 
 class Blackboard(object):
@@ -103,39 +190,75 @@ class Blackboard(object):
         self.term_defs = {0: terms.one}       # maps each index to its definition
         self.terms = {0: terms.one}           # maps each index to its fully expanded term
         self.term_names = {terms.one.key: 0}      # reverse lookup: maps a term to is defining index
+        self.func_terms = {}  # maps each function name to the indices of terms defined with it
+        self.func_args = {}  # maps the index of each FuncTerm to its arguments, as (coeff, index)
+        self.ivars = [terms.IVar(0)]  # the IVar for each index, shared to save building new ones
+        self.expansions = {terms.IVar(0).key: terms.one}  # maps each IVar key to its full term
+        self.expand_cache, self.expand_cache_size = {}, 1  # see expand_term
 
         # comparisons between named subterms
-        self.inequalities = {}  # Dictionary mapping (i, j) to a list of Halfplanes [h1, h2],
+        self.inequalities = {}  # Dictionary mapping (i, j) to a tuple of Halfplanes (h1, h2),
                                 # such that h2 is cw of h1
         self.zero_inequalities = {0: terms.GT}  # Dictionary mapping i to comp
         self.equalities = {}  # Dictionary mapping (i, j) to coeff
         self.zero_equalities = set([])  # Set of IVar indices equal to 0
-        self.disequalities = {}  # Dictionary mapping (i, j) to a set of coeffs
+        self.disequalities = {}  # Dictionary mapping (i, j) to a coeff, or a set of several coeffs
         self.zero_disequalities = set([])  # Set of IVar indices not equal to 0
 
         self.clauses = set()  # List of Clauses
+        self.clause_index = {}  # Dictionary mapping i to a list of the clauses that mention ti
         #self.split = Split(seed=default_seed)  # This object determines how to perform case splits
 
         self.tracker = Tracker(self)
 
+        # incremented whenever a term is defined or a comparison is learned
+        self.revision = 0
+        self.memo, self.memo_revision = {}, 0
+        self.module_state = {}  # see module_table
+
+    def memo_table(self, name):
+        """
+        Returns a dictionary in which modules can cache the results of queries named name.
+        All such tables are emptied whenever the revision changes.
+        """
+        if self.memo_revision != self.revision:
+            self.memo, self.memo_revision = {}, self.revision
+        return self.memo.setdefault(name, {})
+
+    def module_table(self, name):
+        """
+        Returns a dictionary in which modules can keep what they have done to this blackboard.
+        Unlike memo tables, these persist across revisions, and are copied along with the
+        blackboard.
+        """
+        return self.module_state.setdefault(name, {})
+
     def has_name(self, term):
         """
         Takes a Term.
         Returns True if term is syntactically equal to a term defined in the Blackboard, else False.
         """
-        if term.key in self.term_names:
-            return True, self.term_names[term.key]
-        else:
-            t = self.expand_term(term)
-            if t.key in self.term_names:
-                return True, self.term_names[t.key]
+        if isinstance(term, terms.IVar) and term.index < self.num_terms:
+            return True, term.index
+        ind = self.term_names.get(term.key)
+        if ind is None:
+            ind = self.term_names.get(self.expand_term(term).key)
+        if ind is not None:
+            return True, ind
         return False, -1
 
     def expand_term(self, ti):
         """
         Expands a term with IVars into its full definition.
-        """
-        return ti.substitute({terms.IVar(i).key: self.terms[i] for i in range(self.num_terms)})
+        Results are cached by term key until a new term is defined.
+        """
+        if self.expand_cache_size != self.num_terms:
+            self.expand_cache, self.expand_cache_size = {}, self.num_terms
+        try:
+            return self.expand_cache[ti.key]
+        except KeyError:
+            t = self.expand_cache[ti.key] = ti.substitute(self.expansions)
+            return t
 
     def term_name(self, ti):
         """
@@ -143,11 +266,14 @@ class Blackboard(object):
         there is one. If not, recursively creates indices representing t and all its subterms, as
         needed.
         """
+        if isinstance(ti, terms.IVar):
+            return ti
         t = self.expand_term(ti)
         if isinstance(t, terms.IVar):
             return t
-        if t.key in self.term_names:
-            return terms.IVar(self.term_names[t.key])
+        ind = self.term_names.get(t.key)
+        if ind is not None:
+            return self.ivars[ind]
         else:
             if isinstance(t, terms.Var):
                 new_def = t
@@ -167,16 +293,24 @@ class Blackboard(object):
             i = self.num_terms  # index of the new term
             self.term_defs[i] = new_def
             self.terms[i] = t
+            self.ivars.append(terms.IVar(i))
+            self.expansions[self.ivars[i].key] = t
             self.term_names[t.key] = i
+            if isinstance(new_def, terms.FuncTerm):
+                self.func_terms.setdefault(new_def.func_name, []).append(i)
+                self.func_args[i] = tuple((a.coeff, a.term.index) for a in new_def.args)
             self.num_terms += 1
+            self.revision += 1
             if messages.visible(messages.DEF):
                 messages.announce_strong('Defining t{0!s} := {1!s}'.format(i, new_def))
             if messages.visible(messages.DEF_FULL):
                 messages.announce_strong('  := {1!s}'.format(i, t))
-            for j in self.zero_inequalities:
-                hp = geometry.halfplane_of_comp(self.zero_inequalities[j], 0)
-                self.inequalities[j, i] = [hp]
-            return terms.IVar(i)
+            inequalities, history = self.inequalities, self.tracker.history
+            for j, comp in self.zero_inequalities.iteritems():
+                hp = geometry.Halfplane(*zero_halfplane_params[comp][0])
+                inequalities[j, i] = (hp,)
+                history.add((j, i))
+            return self.ivars[i]
 
     def add_term(self, t):
         """
@@ -206,52 +340,99 @@ class Blackboard(object):
         """
         return self.tracker.identify()
 
+    def iter_inequalities(self):
+        """
+        Generates the comparisons t_i <> c*t_j or t_i <> 0.
+        """
+        for i, comp in self.zero_inequalities.iteritems():
+            yield terms.comp_eval[comp](self.ivars[i], 0)
+        for (i, j), hps in self.inequalities.iteritems():
+            for hp in hps:
+                if hp.a != 0 and hp.b != 0:
+                    yield hp.to_comp(self.ivars[i], self.ivars[j])
+
+    def iter_equalities(self):
+        """
+        Generates the equalities t_i == c*t_j or ti == 0. Does not include definitional eqs.
+        """
+        for i in self.zero_equalities:
+            yield self.ivars[i] == 0
+        for (i, j), coeff in self.equalities.iteritems():
+            yield self.ivars[i] == coeff * self.ivars[j]
+
+    def iter_disequalities(self):
+        """
+        Generates the disequalities t_i != c*t_j or t_i != 0.
+        """
+        for i in self.zero_disequalities:
+            yield self.ivars[i] != 0
+        for (i, j) in self.disequalities:
+            for coeff in self.disequality_coeffs(i, j):
+                yield self.ivars[i] != coeff * self.ivars[j]
+
+    def disequality_coeffs(self, i, j):
+        """
+        Returns the collection of coeffs c such that ti != c*tj is stored.
+        """
+        v = self.disequalities.get((i, j), ())
+        return v if isinstance(v, (set, tuple)) else (v,)
+
+    def store_disequality_coeffs(self, i, j, coeffs):
+        """
+        Replaces the coeffs c stored for ti != c*tj. Singletons are stored without a set.
+        """
+        if len(coeffs) > 1:
+            self.disequalities[i, j] = set(coeffs)
+        elif len(coeffs) == 1:
+            self.disequalities[i, j] = next(iter(coeffs))
+        else:
+            self.disequalities.pop((i, j), None)
+
     def get_inequalities(self):
         """
         Returns a list of comparisons t_i <> c*t_j or t_i <> 0.
         """
-        inequalities = []
-        for i in self.zero_inequalities:
-            comp = self.zero_inequalities[i]
-            inequalities.append(terms.comp_eval[comp](terms.IVar(i), 0))
-        for (i, j) in self.inequalities:
-            for hp in self.inequalities[i, j]:
-                if hp.a != 0 and hp.b != 0:
-                    inequalities.append(hp.to_comp(terms.IVar(i), terms.IVar(j)))
-        return inequalities
+        return list(self.iter_inequalities())
 
     def get_equalities(self):
         """
         Returns a list of equalities t_i == c*t_j or ti == 0. Does not include definitional eqs.
         """
-        equalities = [terms.IVar(i) == 0 for i in self.zero_equalities]
-        for p in self.equalities:
-            coeff = self.equalities[p]
-            equalities.append(terms.IVar(p[0]) == coeff * terms.IVar(p[1]))
-        return equalities
+        return list(self.iter_equalities())
 
     def get_disequalities(self):
         """
         Returns a list of disequalities t_i != c*t_j or t_i != 0.
         """
-        disequalities = [terms.IVar(i) != 0 for i in self.zero_disequalities]
-        for p in self.disequalities:
-            coeff_list = self.disequalities[p]
-            for coeff in coeff_list:
-                disequalities.append(terms.IVar(p[0]) != coeff * terms.IVar(p[1]))
-        return disequalities
+        return list(self.iter_disequalities())
 
     def update_clause(self, *p):
         """
         p is either a singleton (i) or a pair (i, j).
         Updates any clauses that have literals containing either t_i or t_i and t_j.
         """
-        for c in self.clauses:
+        # Updating clauses does not change what B knows, so the clauses can share the answers to
+        # their queries.
+        known = {}
+
+        def implies(i, comp, coeff, j):
+            key = (i, comp, coeff, j)
+            if key not in known:
+                known[key] = self.implies(i, comp, coeff, j)
+            return known[key]
+
+        changed = False
+        # Only the clauses mentioning t_i can be affected.
+        for c in self.clause_index.get(p[0], ()):
             if len(p) == 1:
-                c.update_on_index(p[0], self)
+                changed = c.update_on_index(p[0], self, implies) or changed
             else:
-                c.update_on_indices(p[0], p[1], self)
+                changed = c.update_on_indices(p[0], p[1], self, implies) or changed
 
+        # Stored clauses always have at least two disjuncts, so if none has changed there is
+        # nothing more to do. Otherwise the set must be rebuilt, since clauses hash by content.
+        if not changed:
+            return
         self.clauses = set(c for c in self.clauses if not c.satisfied)
 
         empty, unit = None, []
@@ -270,11 +451,21 @@ class Blackboard(object):
         else:  # do these separately, so that learning from one won't recurse to the others.
             for c in unit:
                 self.clauses.remove(c)
+            self.index_clauses()
 
             for c in unit:
                 tc = c.first()
                 self.assert_comparison(tc)
 
+    def index_clauses(self):
+        """
+        Rebuilds clause_index from the stored clauses.
+        """
+        self.clause_index = {}
+        for c in self.clauses:
+            for i in c.indices():
+                self.clause_index.setdefault(i, []).append(c)
+
     def implies(self, i, comp, coeff, j):
         """
         Checks to see if the statement ti comp coeff * tj is known by the Blackboard.
@@ -289,38 +480,38 @@ class Blackboard(object):
                 return self.implies_zero_comparison(i, comp)
             elif coeff1 < 0:
                 return self.implies_zero_comparison(i, terms.comp_reverse(comp))
-            elif comp in [terms.GE, terms.LE, terms.EQ]:
-                return True
             else:
-                return False
+                return comp in reflexive_comps
 
-        if comp in [terms.LT, terms.LE, terms.GE, terms.GT]:
+        # Each table is probed once with this key; most pairs have no entry, so lookups default to
+        # a shared empty value rather than a new list.
+        key = (i, j)
 
-            if j in self.zero_equalities:
-                if i in self.zero_equalities:
-                    return comp in [terms.LE, terms.GE]
-                if i not in self.zero_inequalities:
+        if comp in inequality_comps:
+
+            zero_equalities = self.zero_equalities
+            e_coeff = self.equalities.get(key)
+            if j in zero_equalities:
+                if i in zero_equalities:
+                    return comp in weak_comps
+                comp1 = self.zero_inequalities.get(i)
+                if comp1 is None:
                     return False
-                comp1 = self.zero_inequalities[i]
-                return ((comp1 == comp)
-                        or (comp1 == terms.GT and comp == terms.GE)
-                        or (comp1 == terms.LT and comp == terms.LE))
+                return (comp1, comp) in zero_comp_implications
 
-            elif i in self.zero_equalities:
-                if j not in self.zero_inequalities:
+            elif i in zero_equalities:
+                comp1 = self.zero_inequalities.get(j)
+                if comp1 is None:
                     return False
-                comp1 = terms.comp_reverse(self.zero_inequalities[j])
+                comp1 = terms.comp_reverse(comp1)
                 if coeff < 0:
                     comp1 = terms.comp_reverse(comp1)
                 #print 'know 0 {0} tj, checking 0 {1} tj'.format(terms.comp_str[comp1], terms.comp_str[comp])
-                return ((comp1 == comp)
-                        or (comp1 == terms.GT and comp == terms.GE)
-                        or (comp1 == terms.LT and comp == terms.LE))
+                return (comp1, comp) in zero_comp_implications
 
-            elif (i, j) in self.equalities:
-                e_coeff = self.equalities[i, j]
+            elif e_coeff is not None:
                 if coeff == e_coeff:
-                    return comp in [terms.LE, terms.GE]
+                    return comp in weak_comps
                 pts = [(e_coeff, 1), (-e_coeff, -1)]
                 pts = [p for p in pts if p[0]*self.sign(i) >= 0 and p[1]*self.sign(j) >= 0]
                 return all(terms.comp_eval[comp](p[0], coeff * p[1]) for p in pts)
@@ -328,14 +519,12 @@ class Blackboard(object):
             #el
             else:
 
-                new_comp = geometry.halfplane_of_comp(comp, coeff)
-                old_comps = self.inequalities.get((i, j), [])
+                new_comp = geometry.query_halfplane_of_comp(comp, coeff)
+                old_comps = self.inequalities.get(key, ())
 
-                for c in [d for d in old_comps if d.eq_dir(new_comp)]:
-                    if c.strong or not new_comp.strong:
-                        return True
-                    else:
-                        return False
+                for c in old_comps:
+                    if c.eq_dir(new_comp):
+                        return c.strong or not new_comp.strong
 
                 # If we reach here, then new_comp is not equidirectional with anything in old_comps
                 if new_comp.strong:
@@ -343,7 +532,7 @@ class Blackboard(object):
                     if self.implies(i, n_comp, coeff, j) and \
                             not self.implies_zero_comparison(i, terms.NE) and \
                             not self.implies_zero_comparison(j, terms.NE) and \
-                            not self.has_clause(terms.IVar(i) != 0, terms.IVar(j) != 0):
+                            not self.has_clause(self.ivars[i] != 0, self.ivars[j] != 0):
                         return False
                         # Only ruling out one point
 
@@ -363,12 +552,14 @@ class Blackboard(object):
 
         # All equality info is stored, so see if we know this equality.
         elif comp == terms.EQ:
-            return coeff == self.equalities.get((i, j), None)  # or\
+            return coeff == self.equalities.get(key)  # or\
 #                   (i in self.zero_equalities and j in self.zero_equalities)
 
         # See if we know this disequality, or if the disequality is implied by an inequality.
         elif comp == terms.NE:
-            if coeff in self.disequalities.get((i, j), []):
+            d_coeffs = self.disequalities.get(key)
+            if d_coeffs is not None and (coeff == d_coeffs if not isinstance(d_coeffs, set)
+                                         else coeff in d_coeffs):
                 return True
             return self.implies(i, terms.GT, coeff, j) or self.implies(i, terms.LT, coeff, j)
 
@@ -376,30 +567,13 @@ class Blackboard(object):
         """
         Checks to see if the statement ti comp 0 is known by the Blackboard.
         """
-
         if i in self.zero_equalities:
-            return comp in [terms.LE, terms.GE, terms.EQ]
-
-        if comp in [terms.LT, terms.GT]:
-            return self.zero_inequalities.get(i, terms.EQ) == comp
-
-        elif comp == terms.LE:
-            return self.zero_inequalities.get(i, terms.EQ) in [terms.LE, terms.LT] \
-                or self.implies_zero_comparison(i, terms.EQ)
+            return comp in reflexive_comps
 
-        elif comp == terms.GE:
-            return self.zero_inequalities.get(i, terms.EQ) in [terms.GE, terms.GT] \
-                or self.implies_zero_comparison(i, terms.EQ)
+        if comp == terms.NE and i in self.zero_disequalities:
+            return True
 
-        elif comp == terms.EQ:
-            return i in self.zero_equalities
-
-        elif comp == terms.NE:
-            if i in self.zero_disequalities:
-                return True
-            if i in self.zero_inequalities and self.zero_inequalities[i] in [terms.LT, terms.GT]:
-                return True
-            return False
+        return (self.zero_inequalities.get(i), comp) in zero_comp_implications
 
     def implies_comparison(self, c):
         """
@@ -411,20 +585,26 @@ class Blackboard(object):
 
         term1, comp, coeff, term2 = c.term1, c.comp, c.term2.coeff, c.term2.term
         if coeff == 0:
-            term2 = terms.IVar(0)
+            term2 = self.ivars[0]
         if isinstance(term1, terms.IVar) and isinstance(term2, terms.IVar):
             return self.implies(term1.index, comp, coeff, term2.index)
         else:
             return False
 
-    def has_clause(self, *literals):
+    def make_clause(self, literals):
+        """
+        Takes a list of TermComparisons representing a disjunction, and returns the corresponding
+        Clause between IVars, naming terms as needed.
+        """
         disjunctions = []
         for l in literals:
             tc = l.canonize()
             i, j = self.term_name(tc.term1).index, self.term_name(tc.term2.term).index
             disjunctions.append((i, tc.comp, tc.term2.coeff, j))
-        c = terms.Clause(disjunctions)
+        return terms.Clause(disjunctions)
 
+    def has_clause(self, *literals):
+        c = self.make_clause(literals)
         c.update(self)
 
         return c in self.clauses
@@ -438,44 +618,41 @@ class Blackboard(object):
 
         term1, comp, coeff, term2 = c.term1, c.comp, c.term2.coeff, c.term2.term
         if coeff == 0:
-            term2 = terms.IVar(0)
+            term2 = self.ivars[0]
         if not isinstance(term1, terms.IVar) or not isinstance(term2, terms.IVar):
             ivar1 = term1 if isinstance(term1, terms.IVar) else self.term_name(term1)
             ivar2 = term2 if isinstance(term2, terms.IVar) else self.term_name(term2)
             c = terms.TermComparison(ivar1, comp, coeff * ivar2).canonize()
             term1, comp, coeff, term2 = c.term1, c.comp, c.term2.coeff, c.term2.term
             if coeff == 0:
-                term2 = terms.IVar(0)
-
-        if self.implies(term1.index, comp, coeff, term2.index):
-            return
-        elif self.implies(term1.index, terms.comp_negate(comp), coeff, term2.index):
-            self.raise_contradiction(term1.index, comp, coeff, term2.index)
+                term2 = self.ivars[0]
+
+        i, j = term1.index, term2.index
+        key = (i, j)
+        # If nothing at all is stored about ti and tj, neither the comparison nor its negation can
+        # be implied, and both queries are skipped.
+        if (coeff == 0 or i == j or key in self.inequalities or key in self.equalities
+                or key in self.disequalities or i in self.zero_equalities
+                or j in self.zero_equalities):
+            if self.implies(i, comp, coeff, j):
+                return
+            elif self.implies(i, terms.comp_negate(comp), coeff, j):
+                self.raise_contradiction(i, comp, coeff, j)
 
-        if comp in (terms.GE, terms.GT, terms.LE, terms.LT):
-            if coeff == 0:
-                self.assert_zero_inequality(term1.index, comp)
-            else:
-                self.assert_inequality(term1.index, comp, coeff, term2.index)
-        elif comp == terms.EQ:
-            if coeff == 0:
-                self.assert_zero_equality(term1.index)
-            else:
-                self.assert_equality(term1.index, coeff, term2.index)
-        elif comp == terms.NE:
-            if coeff == 0:
-                self.assert_zero_disequality(term1.index)
-            else:
-                self.assert_disequality(term1.index, coeff, term2.index)
-        else:
-            raise Error('Unrecognized comparison: {0!s}'.format())
+        handler = assert_handlers.get((comp, coeff == 0))
+        if handler is None:
+            raise Error('Unrecognized comparison: {0!s}'.format(comp))
+        handler(self, i, comp, coeff, j)
 
     def add(self, *comparisons):
         """
         Asserts a list of comparisons.
+        Each one is checked against what the ones before it have added, so they are asserted in
+        turn rather than all at once.
         """
+        assert_comparison = self.assert_comparison
         for c in comparisons:
-            self.assert_comparison(c)
+            assert_comparison(c)
 
     def assume(self, *comparisons):
         """
@@ -494,10 +671,11 @@ class Blackboard(object):
         Adds the inequality "ti comp coeff * tj".
         This should never be called directly; rather, assert_comparison should be used.
         """
+        key = (i, j)
         self.announce_comparison(i, comp, coeff, j)
-        self.tracker.update((i, j))
+        self.tracker.update(key)
 
-        old_comps = self.inequalities.get((i, j), [])
+        old_comps = self.inequalities.get(key, ())
         new_comp = geometry.halfplane_of_comp(comp, coeff)
 
 
@@ -521,7 +699,7 @@ class Blackboard(object):
                     #assert(False)
             elif c.opp_dir(new_comp):
                 if (not new_comp.strong) and (not c.strong):
-                    self.assert_comparison(terms.IVar(i) == coeff * terms.IVar(j))
+                    self.assert_comparison(self.ivars[i] == coeff * self.ivars[j])
                 else:
                     assert(False)
                 return
@@ -540,26 +718,26 @@ class Blackboard(object):
             w_comp = terms.GE if comp == terms.GT else terms.LE
             if self.implies(i, w_comp, coeff, j):
                 # The only thing implied is not (ti = tj = 0).
-                self.assert_clause(terms.IVar(i) != 0, terms.IVar(j) != 0)
+                self.assert_clause(self.ivars[i] != 0, self.ivars[j] != 0)
                 return
 
         if len(old_comps) == 0:
-            new_comps = [new_comp]
+            new_comps = (new_comp,)
         elif len(old_comps) == 1:
             old_comp = old_comps[0]
             k = old_comp.compare_hp(new_comp)
             if k < 0:
                 # old_comp is ccw of new_comp
-                new_comps = [old_comp, new_comp]
+                new_comps = (old_comp, new_comp)
             elif k > 0:
-                new_comps = [new_comp, old_comp]
+                new_comps = (new_comp, old_comp)
             else:
                 # we should never reach this point.
                 assert(False)
         else:
             if new_comp.strong and self.implies(i, terms.comp_weaken(comp), coeff, j):
-                self.assert_comparison(terms.IVar(i) != 0)
-                self.assert_comparison(terms.IVar(j) != 0)
+                self.assert_comparison(self.ivars[i] != 0)
+                self.assert_comparison(self.ivars[j] != 0)
                 return
 
             #a, b = old_comps[0], old_comps[1]
@@ -572,21 +750,21 @@ class Blackboard(object):
             # If new_comp is cw from both a and b, take a and new_comp in that order.
             # recall that x.compare_hp(y) > 0 iff y is ccw of x.
             if old_comps[0].compare_hp(new_comp) > 0 and old_comps[1].compare_hp(new_comp) > 0:
-                new_comps = [new_comp, old_comps[1]]
+                new_comps = (new_comp, old_comps[1])
             else:
-                new_comps = [old_comps[0], new_comp]
+                new_comps = (old_comps[0], new_comp)
             if new_comps[0].compare_hp(new_comps[1]) == 0:  # we have equality
-                del self.inequalities[i, j]
+                del self.inequalities[key]
                 self.assert_equality(i, coeff, j)
                 return None
 
-        self.inequalities[i, j] = new_comps
+        self.inequalities[key] = new_comps
 
-        if (i, j) in self.disequalities:
-            diseqs = self.disequalities.pop((i, j))
-            n_diseqs = set(k for k in diseqs if not self.implies(i, terms.NE, k, j))
-            if len(n_diseqs) > 0:
-                self.disequalities[i, j] = n_diseqs
+        if key in self.disequalities:
+            diseqs = self.disequality_coeffs(i, j)
+            del self.disequalities[key]
+            n_diseqs = [k for k in diseqs if not self.implies(i, terms.NE, k, j)]
+            self.store_disequality_coeffs(i, j, n_diseqs)
 
         self.update_clause(i, j)
 
@@ -598,17 +776,17 @@ class Blackboard(object):
         if i in self.zero_disequalities:
             c = terms.GT if comp in [terms.GE, terms.GT] else terms.LT
             self.zero_disequalities.remove(i)
-            des = set(k for k in self.disequalities.get((0, i), set())
-                      if not terms.comp_eval[c](k, 0))
+            des = [k for k in self.disequality_coeffs(0, i) if not terms.comp_eval[c](k, 0)]
             if len(des) > 0:
-                self.disequalities[0, i] = des
+                self.store_disequality_coeffs(0, i, des)
 
         self.announce_zero_comparison(i, comp)
         self.tracker.update(i)
 
-        if i in self.zero_inequalities:
+        old_comp = self.zero_inequalities.get(i)
+        if old_comp is not None:
             # We know that the new info is new and noncontradictory.
-            if self.zero_inequalities[i] in [terms.LE, terms.GE] and comp in [terms.LE, terms.GE]:
+            if old_comp in weak_comps and comp in weak_comps:
                 # learn equality
                 del self.zero_inequalities[i]
                 self.assert_zero_equality(i)
@@ -616,14 +794,25 @@ class Blackboard(object):
 
         self.zero_inequalities[i] = comp
         new_zero_ineqs = []
-        for j in (j for j in range(self.num_terms) if j != i):
-            p = (i, j) if i < j else (j, i)
-            old_comps = self.inequalities.get(p, [])
+        lo_params, hi_params = zero_halfplane_params[comp]
+        # this loop runs over every term, so look up the names it uses once
+        inequalities, update, halfplane = self.inequalities, self.tracker.update, geometry.Halfplane
+        for j in range(self.num_terms):
+            if j == i:
+                continue
             if i < j:
-                new_comp = geometry.halfplane_of_comp(comp, 0)
+                p, new_comp = (i, j), halfplane(*lo_params)
             else:
-                new_comp = geometry.Halfplane((1 if comp in [terms.GE, terms.GT] else -1), 0,
-                                              (True if comp in [terms.LT, terms.GT] else False))
+                p, new_comp = (j, i), halfplane(*hi_params)
+            old_comps = inequalities.get(p)
+
+            # Most pairs have no stored comparison yet. The new one is all there is to know about
+            # them, and a single comparison cannot determine the sign of tj.
+            if not old_comps:
+                inequalities[p] = (new_comp,)
+                update(p)
+                continue
+
             cont = False
             for c in old_comps:
                 if c.eq_dir(new_comp) and c.strong is False and new_comp.strong is True:
@@ -632,40 +821,38 @@ class Blackboard(object):
             if cont:
                 continue
 
-            if len(old_comps) == 0:
-                new_comps = [new_comp]
-            elif len(old_comps) == 1:
+            if len(old_comps) == 1:
                 if old_comps[0].compare_hp(new_comp) > 0:  # old is cw of new
-                    new_comps = [new_comp, old_comps[0]]
+                    new_comps = (new_comp, old_comps[0])
                 else:
-                    new_comps = [old_comps[0], new_comp]
+                    new_comps = (old_comps[0], new_comp)
             else:
                 a_cw_n = old_comps[0].compare_hp(new_comp)
                 b_cw_n = old_comps[1].compare_hp(new_comp)
                 if a_cw_n > 0 and b_cw_n > 0:
-                    new_comps = [new_comp, old_comps[1]]
+                    new_comps = (new_comp, old_comps[1])
                 elif a_cw_n < 0 and b_cw_n < 0:
-                    new_comps = [old_comps[0], new_comp]
+                    new_comps = (old_comps[0], new_comp)
                 else:
                     new_comps = old_comps
-            self.inequalities[p] = new_comps
-            self.tracker.update(p)
-
-            if self.sign(j) == 0 and len(self.inequalities[p]) == 2:
-                j_g_0 = geometry.Halfplane(1, 0, True) if i < j else geometry.Halfplane(0, -1, True)
-                cw_a = j_g_0.compare_hp(self.inequalities[p][0])
-                cw_b = j_g_0.compare_hp(self.inequalities[p][1])
-                strong = self.inequalities[p][0].strong and self.inequalities[p][1].strong
+            inequalities[p] = new_comps
+            update(p)
+
+            if len(new_comps) == 2 and self.sign(j) == 0:
+                j_g_0 = halfplane(1, 0, True) if i < j else halfplane(0, -1, True)
+                cw_a = j_g_0.compare_hp(new_comps[0])
+                cw_b = j_g_0.compare_hp(new_comps[1])
+                strong = new_comps[0].strong and new_comps[1].strong
                 if cw_a > 0 > cw_b:
                     if strong:
-                        new_zero_ineqs.append(terms.IVar(j) > 0)
+                        new_zero_ineqs.append(self.ivars[j] > 0)
                     else:
-                        new_zero_ineqs.append(terms.IVar(j) >= 0)
+                        new_zero_ineqs.append(self.ivars[j] >= 0)
                 elif cw_a < 0 < cw_b:
                     if strong:
-                        new_zero_ineqs.append(terms.IVar(j) < 0)
+                        new_zero_ineqs.append(self.ivars[j] < 0)
                     else:
-                        new_zero_ineqs.append(terms.IVar(j) < 0)
+                        new_zero_ineqs.append(self.ivars[j] < 0)
         for c in new_zero_ineqs:
             self.assert_comparison(c)
 
@@ -676,13 +863,12 @@ class Blackboard(object):
         Adds the equality "ti = coeff * tj"
         This should never be called directly; rather, assert_comparison should be used.
         """
-        self.equalities[i, j] = coeff
-        if (i, j) in self.inequalities:
-            self.inequalities.pop(i, j)
-        if (i, j) in self.disequalities:
-            self.disequalities.pop(i, j)
+        key = (i, j)
+        self.equalities[key] = coeff
+        # The stored comparisons between ti and tj are kept: with coeffs other than this one they
+        # can still carry information, e.g. ti < -tj together with ti = tj gives tj < 0.
         self.announce_comparison(i, terms.EQ, coeff, j)
-        self.tracker.update((i, j))
+        self.tracker.update(key)
         self.update_clause(i, j)
 
     def assert_zero_equality(self, i):
@@ -691,7 +877,7 @@ class Blackboard(object):
         This should never be called directly; rather, assert_comparison should be used.
         """
         for k in self.zero_equalities:
-            self.assert_comparison(terms.IVar(i) == terms.IVar(k))
+            self.assert_comparison(self.ivars[i] == self.ivars[k])
         self.zero_equalities.add(i)
         # todo: there's a lot of simplification that could happen if a term is equal to 0
         self.announce_zero_comparison(i, terms.EQ)
@@ -706,28 +892,30 @@ class Blackboard(object):
         # Print this now, in case the disequality is superseded; we want to see this first.
         self.announce_comparison(i, terms.NE, coeff, j)
 
+        key = (i, j)
         superseded = False
-        if (i, j) in self.inequalities:
-            for c in self.inequalities[i, j]:
-                comp = c.to_comp(terms.IVar(i), terms.IVar(j))
-                comp1, coeff1 = comp.comp, comp.term2.coeff
-                if coeff1 == coeff:
-                    if comp1 == terms.GE:
-                        self.assert_inequality(i, terms.GT, coeff, j)
-                        superseded = True
-                    elif comp1 == terms.LE:
-                        self.assert_inequality(i, terms.LT, coeff, j)
-                        superseded = True
+        for c in self.inequalities.get(key, ()):
+            comp = c.to_comp(self.ivars[i], self.ivars[j])
+            comp1, coeff1 = comp.comp, comp.term2.coeff
+            if coeff1 == coeff:
+                if comp1 == terms.GE:
+                    self.assert_inequality(i, terms.GT, coeff, j)
+                    superseded = True
+                elif comp1 == terms.LE:
+                    self.assert_inequality(i, terms.LT, coeff, j)
+                    superseded = True
 
         if not superseded:
-            if (i, j) in self.disequalities:
-                if coeff not in self.disequalities[i, j]:
-                    self.disequalities[i, j].add(coeff)
-            else:
-                self.disequalities[i, j] = {coeff}
+            d_coeffs = self.disequalities.get(key)
+            if d_coeffs is None:
+                self.disequalities[key] = coeff
+            elif isinstance(d_coeffs, set):
+                d_coeffs.add(coeff)
+            elif d_coeffs != coeff:
+                self.disequalities[key] = {d_coeffs, coeff}
 
             self.update_clause(i, j)
-            self.tracker.update((i, j))
+            self.tracker.update(key)
 
     def assert_zero_disequality(self, i):
         """
@@ -736,8 +924,8 @@ class Blackboard(object):
         """
         self.announce_zero_comparison(i, terms.NE)
 
-        if i in self.zero_inequalities:
-            comp = self.zero_inequalities[i]
+        comp = self.zero_inequalities.get(i)
+        if comp is not None:
             if comp == terms.LE:
                 self.assert_zero_inequality(i, terms.LT)
             elif comp == terms.GE:
@@ -754,24 +942,25 @@ class Blackboard(object):
         Stores the list as a Clause object.
         """
         #todo: ASSERTION_FULL version
-        disjunctions = []
-        for l in literals:
-            tc = l.canonize()
-            i, j = self.term_name(tc.term1).index, self.term_name(tc.term2.term).index
-            disjunctions.append((i, tc.comp, tc.term2.coeff, j))
-        c = terms.Clause(disjunctions)
+        c = self.make_clause(literals)
 
-        s = str(c)
+        # the clause is reported as given, before update simplifies it
+        visible = messages.assertions_visible and messages.visible(messages.ASSERTION)
+        if visible:
+            s = str(c)
 
         c.update(self)
         if c.satisfied:
             return
 
-        if messages.visible(messages.ASSERTION) and c not in self.clauses:
+        if visible and c not in self.clauses:
             messages.announce_strong('Asserting clause: {0!s}'.format(s))
         l = len(c)
         if l > 1:
-            self.clauses.add(c)
+            if c not in self.clauses:
+                self.clauses.add(c)
+                for i in c.indices():
+                    self.clause_index.setdefault(i, []).append(c)
         elif l == 1:
             self.assert_comparison(c.first())
         else:
@@ -782,6 +971,8 @@ class Blackboard(object):
         """
         Reports a successful assertion to the user.
         """
+        if not messages.assertions_visible:
+            return
         if messages.visible(messages.ASSERTION):
             messages.announce_strong(
                 'Asserting {0!s}'.format(terms.TermComparison(terms.IVar(i), comp,
@@ -795,6 +986,8 @@ class Blackboard(object):
         """
         Reports a successful assertion to the user.
         """
+        if not messages.assertions_visible:
+            return
         if messages.visible(messages.ASSERTION):
             messages.announce_strong(
                 'Asserting {0!s}'.format(terms.TermComparison(terms.IVar(i), comp, terms.zero)))
@@ -815,303 +1008,183 @@ class Blackboard(object):
         """
         Returns 1 if ti > 0, -1 if ti < 0, 0 if = 0 or unknown
         """
-        if i in self.zero_inequalities:
-            comp = self.zero_inequalities[i]
-            if comp == terms.GT:
-                return 1
-            elif comp == terms.LT:
-                return -1
-        return 0
+        return comp_sign.get(self.zero_inequalities.get(i), 0)
 
     def weak_sign(self, i):
         """
         Returns 1 if ti >= 0, -1 if ti <= 0, 0 if = 0 or unknown
         """
-        if i in self.zero_inequalities:
-            comp = self.zero_inequalities[i]
-            if comp in (terms.GT, terms.GE):
-                return 1
-            elif comp in (terms.LT, terms.LE):
-                return -1
-        return 0
+        return comp_weak_sign.get(self.zero_inequalities.get(i), 0)
 
     def info_dump(self):
         """
         For debugging purposes.
         Prints out all information known by the Blackboard.
         """
-        st = '\n******\n'
+        st = ['\n******\n']
         for i in self.term_defs:
-            st += '{0!s} := {1!s}\n'.format(terms.IVar(i), self.term_defs[i])
+            st.append('{0!s} := {1!s}\n'.format(terms.IVar(i), self.term_defs[i]))
 
         for i in self.zero_equalities:
-            st += '{0!s} = 0\n'.format(terms.IVar(i))
+            st.append('{0!s} = 0\n'.format(terms.IVar(i)))
 
-        for i in self.zero_inequalities:
-            st += '{0!s} {1!s} 0\n'.format(terms.IVar(i), terms.comp_str[self.zero_inequalities[i]])
+        for i, comp in self.zero_inequalities.iteritems():
+            st.append('{0!s} {1!s} 0\n'.format(terms.IVar(i), terms.comp_str[comp]))
 
         for i in self.zero_disequalities:
-            st += '{0!s} != 0\n'.format(terms.IVar(i))
+            st.append('{0!s} != 0\n'.format(terms.IVar(i)))
 
-        for (i, j) in sorted(self.equalities.keys()):
-            st += '{0!s} = {1!s}\n'.format(terms.IVar(i), self.equalities[i, j] * terms.IVar(j))
+        for (i, j), coeff in sorted(self.equalities.iteritems()):
+            st.append('{0!s} = {1!s}\n'.format(terms.IVar(i), coeff * terms.IVar(j)))
 
         for (i, j) in sorted(self.inequalities.keys()):
             for c in self.inequalities[i, j]:
                 if c.a != 0 and c.b != 0:
-                    st += str(c.to_comp(terms.IVar(i), terms.IVar(j))) + '\n'
+                    st.append(str(c.to_comp(terms.IVar(i), terms.IVar(j))) + '\n')
 
         for (i, j) in sorted(self.disequalities.keys()):
-            for val in self.disequalities[i, j]:
-                st += '{0!s} != {1!s}\n'.format(terms.IVar(i), val * terms.IVar(j))
+            for val in self.disequality_coeffs(i, j):
+                st.append('{0!s} != {1!s}\n'.format(terms.IVar(i), val * terms.IVar(j)))
 
-        st += '\n******\n'
-        return st
+        st.append('\n******\n')
+        return ''.join(st)
     
     def get_halfplane_comparisons(self, i, j):
         """
         Assumes i ~= j, no equalities between ti and tj are known, and neither ti == 0 nor tj == 0
         are known.
         Returns a list of the at most two strongest half plane comparisons between ti and tj.
+        The halfplanes returned may be shared, and should not be modified.
         """
-    
+        cache = self.memo_table('halfplane_comparisons')
+        key = (i, j)
+        hp_comps = cache.get(key)
+        if hp_comps is not None:
+            return hp_comps
+
         if i < j:
-            hp_comps = self.inequalities.get((i, j), [])
+            hp_comps = self.inequalities.get(key, ())
         else:
-            hp_comps = [geometry.halfplane_flip(hp) for hp in self.inequalities.get((j, i), [])]
-    
-        if i in self.zero_inequalities:
-            comp = self.zero_inequalities[i]
-            if comp in [terms.GT, terms.GE]:
-                new_hp = geometry.Halfplane(0, -1, (True if comp == terms.GT else False))
-            else:
-                new_hp = geometry.Halfplane(0, 1, (True if comp == terms.LT else False))
-            hp_comps = geometry.add_halfplane_comparison(new_hp, hp_comps)
-    
-        if j in self.zero_inequalities:
-            comp = self.zero_inequalities[j]
-            if comp in [terms.GT, terms.GE]:
-                new_hp = geometry.Halfplane(-1, 0, (True if comp == terms.GT else False))
-            else:
-                new_hp = geometry.Halfplane(1, 0, (True if comp == terms.LT else False))
-            hp_comps = geometry.add_halfplane_comparison(new_hp, hp_comps)
-    
+            hp_comps = tuple(geometry.halfplane_flip(hp) for hp in self.inequalities.get((j, i), ()))
+
+        comp = self.zero_inequalities.get(i)
+        if comp is not None:
+            hp_comps = geometry.add_halfplane_comparison(zero_halfplanes_first[comp], hp_comps)
+
+        comp = self.zero_inequalities.get(j)
+        if comp is not None:
+            hp_comps = geometry.add_halfplane_comparison(zero_halfplanes_second[comp], hp_comps)
+
+        cache[key] = hp_comps
         return hp_comps
-    
+
     def get_le_range(self, i, j):
         """
         Takes two indices, i, j < self,num_terms.
         Returns an geometry.ComparisonRange for the comparison t_i <= c * t_j.
         """
+        return self.get_range(i, j, True)
 
-        si = self.sign(i)
-        wsi = self.weak_sign(i)
-        sj = self.sign(j)
-        wsj = self.weak_sign(j)
-    
-        if i == j or (i < j and (i, j) in self.equalities) or (j < i and (j, i) in self.equalities):
-            if i == j:
-                coeff = geometry.Extended(1)
-            elif i < j:
-                coeff = geometry.Extended(self.equalities[i, j])
-            else:
-                coeff = geometry.Extended(1 / self.equalities[j, i])
-            if sj == 1:
-                return geometry.ComparisonRange(coeff, geometry.infty, False, True, True)
-            elif wsj == 1:
-                return geometry.ComparisonRange(coeff, geometry.infty, False, False, False)
-            elif sj == -1:
-                return geometry.ComparisonRange(geometry.neg_infty, coeff, True, True, False)
-            elif wsj == -1:
-                return geometry.ComparisonRange(geometry.neg_infty, coeff, False, False, False)
-            else:
-                return geometry.ComparisonRange(coeff, coeff, False, False, False)
-    
-        if j in self.zero_equalities:
-            if i in self.zero_equalities:
-                return geometry.ComparisonRange(geometry.neg_infty, geometry.infty,
-                                                False, False, False)
-            elif i in self.zero_inequalities:
-                if self.zero_inequalities[i] == terms.LT:
-                    return geometry.ComparisonRange(geometry.neg_infty, geometry.infty,
-                                                    True, True, True)
-                elif self.zero_inequalities[i] == terms.LE:
-                    return geometry.ComparisonRange(geometry.neg_infty, geometry.infty,
-                                                    False, False, False)
-                else:
-                    return geometry.empty_range
-            else:
-                return geometry.empty_range
-    
-        if i in self.zero_equalities:
-            if j in self.zero_inequalities:
-                comp = self.zero_inequalities[j]
-                if comp == terms.GT:
-                    return geometry.ComparisonRange(geometry.Extended(0), geometry.infty,
-                                                    False, True, True)
-                elif comp == terms.GE:
-                    return geometry.ComparisonRange(geometry.Extended(0), geometry.infty,
-                                                    False, False, False)
-                elif comp == terms.LE:
-                    return geometry.ComparisonRange(geometry.neg_infty, geometry.Extended(0),
-                                                    False, False, False)
-                else:
-                    return geometry.ComparisonRange(geometry.neg_infty, geometry.Extended(0),
-                                                    False, True, True)
-            else:
-                return geometry.empty_range
-    
-        hp_comps = self.get_halfplane_comparisons(i, j)
-        if len(hp_comps) == 0:
-            return geometry.empty_range
-        if len(hp_comps) == 1:
-            hp = hp_comps[0]
-            if hp.b <= 0:
-                return geometry.empty_range
-            else:
-                coeff = geometry.Extended(hp.a / hp.b)
-                strict = hp.strong
-                return geometry.ComparisonRange(coeff, coeff, strict, strict, strict)
-        else:
-            hp0, hp1 = hp_comps[0], hp_comps[1]
-            interior_strong = (self.implies_zero_comparison(i, terms.NE) or
-                               self.implies_zero_comparison(j, terms.NE))
-            if hp0.compare_hp(hp1) == 1:
-                hp0, hp1 = hp1, hp0
-            if hp0.b <= 0 and hp1.b <= 0:
-                return geometry.empty_range
-            elif hp0.b <= 0:
-                lower = geometry.neg_infty
-                upper = geometry.Extended(hp1.a / hp1.b)
-                return geometry.ComparisonRange(lower, upper, True, interior_strong, hp1.strong)
-            elif hp1.b <= 0:
-                lower = geometry.Extended(hp0.a / hp0.b)
-                upper = geometry.infty
-                return geometry.ComparisonRange(lower, upper, hp0.strong, interior_strong, True)
-            else:
-                lower = geometry.Extended(hp0.a / hp0.b)
-                upper = geometry.Extended(hp1.a / hp1.b)
-                return geometry.ComparisonRange(lower, upper,
-                                                hp0.strong, interior_strong, hp1.strong)
-    
-    
-    # TODO: this is similar to the previous one. Can they be combined?
     def get_ge_range(self, i, j):
         """
         Takes two indices, i, j < self,num_terms.
         Returns an geometry.ComparisonRange for the comparison t_i >= c * t_j.
         """
+        return self.get_range(i, j, False)
 
-        si = self.sign(i)
-        wsi = self.weak_sign(i)
-        sj = self.sign(j)
-        wsj = self.weak_sign(j)
-    
-        if i == j or (i < j and (i, j) in self.equalities) or (j < i and (j, i) in self.equalities):
-            if i == j:
-                coeff = geometry.Extended(1)
-            elif i < j:
-                coeff = geometry.Extended(self.equalities[i, j])
-            else:
-                coeff = geometry.Extended(1 / self.equalities[j, i])
+    def get_range(self, i, j, le):
+        """
+        Returns get_le_range(i, j) if le is True, and get_ge_range(i, j) otherwise.
+        Results are cached until the blackboard learns something new.
+        """
+        cache = self.memo_table('get_range')
+        key = (i, j, le)
+        rng = cache.get(key)
+        if rng is None:
+            rng = cache[key] = self._get_range(i, j, le)
+        return rng
+
+    def _get_range(self, i, j, le):
+        # The ge case is the le case with the sign of tj, and of the halfplanes, reversed.
+        d = 1 if le else -1
+
+        if i == j:
+            e_coeff = 1
+        elif i < j:
+            e_coeff = self.equalities.get((i, j))
+        else:
+            e_coeff = self.equalities.get((j, i))
+            if e_coeff is not None:
+                e_coeff = 1 / e_coeff
+
+        if e_coeff is not None:
+            # only this case depends on the sign of tj
+            sj, wsj = d * self.sign(j), d * self.weak_sign(j)
+            coeff = geometry.Extended(e_coeff)
             if sj == 1:
-                return geometry.ComparisonRange(geometry.neg_infty, coeff, True, True, False)
+                return geometry.ComparisonRange(coeff, geometry.infty, False, True, True)
             elif wsj == 1:
-                return geometry.ComparisonRange(geometry.neg_infty, coeff, False, False, False)
+                return geometry.ComparisonRange(coeff, geometry.infty, False, False, False)
             elif sj == -1:
-                return geometry.ComparisonRange(coeff, geometry.infty, False, True, True)
+                return geometry.ComparisonRange(geometry.neg_infty, coeff, True, True, False)
             elif wsj == -1:
-                return geometry.ComparisonRange(coeff, geometry.infty, False, False, False)
+                return geometry.ComparisonRange(geometry.neg_infty, coeff, False, False, False)
             else:
                 return geometry.ComparisonRange(coeff, coeff, False, False, False)
-    
+
         if j in self.zero_equalities:
             if i in self.zero_equalities:
                 return geometry.ComparisonRange(geometry.neg_infty, geometry.infty,
                                                 False, False, False)
-            elif i in self.zero_inequalities:
-                if self.zero_inequalities[i] == terms.GT:
-                    return geometry.ComparisonRange(geometry.neg_infty, geometry.infty,
-                                                    True, True, True)
-                elif self.zero_inequalities[i] == terms.GE:
-                    return geometry.ComparisonRange(geometry.neg_infty, geometry.infty,
-                                                    False, False, False)
-                else:
-                    return geometry.empty_range
+            comp = self.zero_inequalities.get(i)
+            if comp == (terms.LT if le else terms.GT):
+                return geometry.ComparisonRange(geometry.neg_infty, geometry.infty,
+                                                True, True, True)
+            elif comp == (terms.LE if le else terms.GE):
+                return geometry.ComparisonRange(geometry.neg_infty, geometry.infty,
+                                                False, False, False)
             else:
                 return geometry.empty_range
-    
+
         if i in self.zero_equalities:
-            if j in self.zero_inequalities:
-                comp = self.zero_inequalities[j]
-                if comp == terms.GT:
-                    return geometry.ComparisonRange(geometry.neg_infty, geometry.Extended(0),
-                                                    True, True, False)
-                elif comp == terms.GE:
-                    return geometry.ComparisonRange(geometry.neg_infty, geometry.Extended(0),
-                                                    False, False, False)
-                elif comp == terms.LE:
-                    return geometry.ComparisonRange(geometry.Extended(0), geometry.infty,
-                                                    False, False, False)
-                else:
-                    return geometry.ComparisonRange(geometry.Extended(0), geometry.infty,
-                                                    True, True, False)
+            comp = self.zero_inequalities.get(j)
+            if comp is not None:
+                return zero_ranges[le, comp]
             else:
                 return geometry.empty_range
-    
+
         hp_comps = self.get_halfplane_comparisons(i, j)
-        if len(hp_comps) == 0:
-            return geometry.empty_range
-        if len(hp_comps) == 1:
-            hp = hp_comps[0]
-            if hp.b >= 0:
-                return geometry.empty_range
-            else:
-                coeff = geometry.Extended(hp.a / hp.b)
-                strict = hp.strong
-                return geometry.ComparisonRange(coeff, coeff, strict, strict, strict)
-        else:
-            hp0, hp1 = hp_comps[0], hp_comps[1]
-            interior_strong = (self.implies_zero_comparison(i, terms.NE) or
-                               self.implies_zero_comparison(j, terms.NE))
-            if hp0.compare_hp(hp1) == 1:
-                hp0, hp1 = hp1, hp0
-            if hp0.b >= 0 and hp1.b >= 0:
-                return geometry.empty_range
-            elif hp0.b >= 0:
-                lower = geometry.neg_infty
-                upper = geometry.Extended(hp1.a / hp1.b)
-                return geometry.ComparisonRange(lower, upper, True, interior_strong, hp1.strong)
-            elif hp1.b >= 0:
-                lower = geometry.Extended(hp0.a / hp0.b)
-                upper = geometry.infty
-                return geometry.ComparisonRange(lower, upper, hp0.strong, interior_strong, True)
-            else:
-                lower = geometry.Extended(hp0.a / hp0.b)
-                upper = geometry.Extended(hp1.a / hp1.b)
-                return geometry.ComparisonRange(lower, upper,
-                                                hp0.strong, interior_strong, hp1.strong)
+        # the interior is strict if ti != 0 or tj != 0; only a pair of halfplanes has one
+        interior_strong = len(hp_comps) == 2 and (self.implies_zero_comparison(i, terms.NE) or
+                                                  self.implies_zero_comparison(j, terms.NE))
+        return geometry.halfplanes_range(hp_comps, d, interior_strong)
 
     def le_coeff_range(self, i, j, coeff):
         """
         Takes a blackboard, B, and i, j < B.num_terms.
         Returns a comparison range for the relation c * ti <= coeff * tj, i.e. a range of values for
         c for which the comparison is known to hold.
+        Results are cached until the blackboard learns something new.
         """
+        cache = self.memo_table('le_coeff_range')
+        key = (i, j, coeff)
+        rng = cache.get(key)
+        if rng is None:
+            rng = cache[key] = self._le_coeff_range(i, j, coeff)
+        return rng
 
+    def _le_coeff_range(self, i, j, coeff):
         if coeff == 0:
             if i in self.zero_equalities:
                 return geometry.ComparisonRange(geometry.neg_infty, geometry.infty,
                                                 False, False, False)
-            elif i in self.zero_inequalities:
-                if self.zero_inequalities[i] == terms.GT:
-                    return geometry.ComparisonRange(geometry.neg_infty, geometry.infty,
-                                                    True, True, True)
-                elif self.zero_inequalities[i] == terms.GE:
-                    return geometry.ComparisonRange(geometry.neg_infty, geometry.infty,
-                                                    False, False, False)
-                else:
-                    return geometry.empty_range
+            comp = self.zero_inequalities.get(i)
+            if comp == terms.GT:
+                return geometry.ComparisonRange(geometry.neg_infty, geometry.infty,
+                                                True, True, True)
+            elif comp == terms.GE:
+                return geometry.ComparisonRange(geometry.neg_infty, geometry.infty,
+                                                False, False, False)
             else:
                 return geometry.empty_range
         elif coeff > 0:
@@ -35,7 +35,7 @@ class Axiom:
     """
     literals is a list of term_comparisons. The axiom represents their disjunction.
     """
-    def __init__(self, literals, triggers=list()):
+    def __init__(self, literals, triggers=None):
         #todo: make triggers a set
 
         def find_uvars(term):
@@ -101,6 +101,11 @@ class Axiom:
         else:
             self.unifiable = True
         self.vars, self.arg_vars, self.trig_arg_vars = uvars, arg_uvars, trig_arg_uvars
+        # fixed orderings of the variables, in which unification assigns them
+        self.var_list, self.trig_arg_var_list = list(uvars), list(trig_arg_uvars)
+        # each literal t1 comp c*t2 as a tuple (comp, t1, c, t2)
+        self.literal_parts = [(l.comp, l.term1, l.term2.coeff, l.term2.term) for l in self.literals]
+        self.key = str(self)  # axioms are compared and hashed by their printed form
 
     def __str__(self):
         str1 = "{For all " + ", ".join(str(terms.UVar(u)) for u in self.vars) + ": "
@@ -113,10 +118,10 @@ class Axiom:
     def __eq__(self, other):
         if not isinstance(other, Axiom):
             return False
-        return str(self) == str(other)
+        return self.key == other.key
 
     def __hash__(self):
-        return hash(str(self))
+        return hash(self.key)
 
 
 class Formula:
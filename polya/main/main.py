@@ -136,7 +136,7 @@ def run(B):
     return solve_util.run(B, default_split_depth, default_split_breadth, default_solver)
 
 
-def Solver(assertions=list(), terms=list(), axioms=list(), modules=list(),
+def Solver(assertions=None, terms=None, axioms=None, modules=None,
            split_depth=default_split_depth, split_breadth=default_split_breadth,
            solver_type=default_solver):
     """
@@ -149,7 +149,11 @@ def Solver(assertions=list(), terms=list(), axioms=list(), modules=list(),
      -- split_breadth: How many split options to consider.
      -- solver_type: 'fm' or 'poly' arithmetic.
     """
-    return solve_util.Solver(split_depth, split_breadth, assertions, terms, axioms, modules,
+    return solve_util.Solver(split_depth, split_breadth,
+                             assertions if assertions is not None else list(),
+                             terms if terms is not None else list(),
+                             axioms if axioms is not None else list(),
+                             modules if modules is not None else list(),
                              solver_type)
 
 
@@ -7,7 +7,7 @@
 # Rob Lewis
 #
 # User messages. Modules tag messages with a description of the type of information. The user
-# sets the global variable 'verbosity' with a list of tags as to what should be printed out.
+# calls set_verbosity with a list of tags as to what should be printed out.
 #
 # The intended tags are as follows:
 #
@@ -35,10 +35,15 @@ debug = (INFO, MODULE, MODULE_PAD, DEF, DEF_FULL, ASSERTION, ASSERTION_FULL, DEB
 # global verbosity level
 verbosity = normal
 
+# whether either kind of assertion message is displayed. Assertions are frequent, so the
+# blackboard checks this before doing any other work to report them.
+assertions_visible = True
+
 
 def set_verbosity(level=normal):
-    global verbosity
+    global verbosity, assertions_visible
     verbosity = level
+    assertions_visible = ASSERTION in level or ASSERTION_FULL in level
 
 
 def announce_module(module):
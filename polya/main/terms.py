@@ -91,6 +91,7 @@ class Term(object):
 
     def __init__(self):
         self.key = None
+        self.free_uvars = frozenset()  # indices of the UVars occurring in the term
         self.__hash__ = None
 
     def pretty_print(self):
@@ -259,6 +260,7 @@ class AppTerm(Term):
         self.func_name = func_name
         self.args = map(make_arg, args)
         self.key = key + tuple([a.key for a in self.args])
+        self.free_uvars = frozenset().union(*[a.free_uvars for a in self.args])
 
 
 ####################################################################################################
@@ -292,6 +294,7 @@ class UVar(Atom):
     def __init__(self, index):
         self.index = index
         Atom.__init__(self, 'u' + str(index), key=(40, index))
+        self.free_uvars = frozenset([index])
 
 
 def _str_to_list(s):
@@ -611,6 +614,7 @@ class STerm(object):
         #    self.term = One()
         self.term = term
         self.key = (term.key, coeff)
+        self.free_uvars = term.free_uvars
         self.__hash__ = None
 
     def pretty_print(self):
@@ -765,6 +769,7 @@ class MulPair(object):
         self.term = term
         self.exponent = exponent
         self.key = (term.key, exponent)
+        self.free_uvars = term.free_uvars
 
     def pretty_print(self):
         if self.exponent == 1:
@@ -923,23 +928,18 @@ class Clause:
             else:  # c is a tuple
                 i, comp, coeff, j = c[0], c[1], c[2], c[3]
             if coeff == 0:
-                if i in self.zero_comparisons:  # do we need to check for ca in self.cmap[i]?
-                    self.zero_comparisons[i].append(comp)
-                else:
-                    self.zero_comparisons[i] = [comp]
+                # do we need to check for ca in self.cmap[i]?
+                self.zero_comparisons.setdefault(i, []).append(comp)
             else:
-                if (i, j) in self.comparisons:
-                    self.comparisons[i, j].append((comp, coeff))
-                else:
-                    self.comparisons[i, j] = [(comp, coeff)]
+                self.comparisons.setdefault((i, j), []).append((comp, coeff))
         self.satisfied = False
 
     def __len__(self):
         """
         Returns the number of disjuncts in the clause.
         """
-        return (sum(len(self.comparisons[key]) for key in self.comparisons) +
-                sum(len(self.zero_comparisons[key]) for key in self.zero_comparisons))
+        return (sum(len(comps) for comps in self.comparisons.itervalues()) +
+                sum(len(comps) for comps in self.zero_comparisons.itervalues()))
 
     def __str__(self):
         cstrs = []
@@ -972,17 +972,27 @@ class Clause:
     def __hash__(self):
         return hash(str(self))
 
+    def indices(self):
+        """
+        Returns the set of IVar indices mentioned in the clause.
+        """
+        inds = set(self.zero_comparisons)
+        for (i, j) in self.comparisons:
+            inds.add(i)
+            inds.add(j)
+        return inds
+
     def unit(self):
         """
         Returns true if there is only one disjunct left. False otherwise.
         """
         ctr = 0
-        for k in self.comparisons:
-            ctr += len(self.comparisons[k])
+        for comps in self.comparisons.itervalues():
+            ctr += len(comps)
             if ctr > 1:
                 return False
-        for k in self.zero_comparisons:
-            ctr += len(self.zero_comparisons[k])
+        for comps in self.zero_comparisons.itervalues():
+            ctr += len(comps)
             if ctr > 1:
                 return False
         return ctr == 1
@@ -993,51 +1003,69 @@ class Clause:
         Specifically, if the clause has one element, it returns that element.
         Raises exception if len is 0
         """
-        try:
-            k = next(key for key in self.comparisons if len(self.comparisons[key]) != 0)
-            comp, coeff = self.comparisons[k][0]
-            return comp_eval[comp](IVar(k[0]), coeff*IVar(k[1]))
-        except StopIteration:
-            pass
-        k = next(key for key in self.zero_comparisons if len(self.zero_comparisons[key]) != 0)
-        return comp_eval[self.zero_comparisons[k][0]](IVar(k), 0)
-
-    def update_on_index(self, i, B):
+        for (i, j), comps in self.comparisons.iteritems():
+            if comps:
+                comp, coeff = comps[0]
+                return comp_eval[comp](IVar(i), coeff*IVar(j))
+        for i, comps in self.zero_comparisons.iteritems():
+            if comps:
+                return comp_eval[comps[0]](IVar(i), 0)
+        raise StopIteration
+
+    def update_on_index(self, i, B, implies=None):
         """
         Looks at all disjuncts involving index i and sees if they are satisfied in blackboard B.
+        Optional implies is used in place of B.implies.
+        Returns True if the clause has changed.
         """
+        implies = implies or B.implies
+        changed = False
         if i in self.zero_comparisons:
-            self.zero_comparisons[i] = [c for c in self.zero_comparisons[i]
-                                        if not B.implies(i, comp_negate(c), 0, 0)]
-            if any(B.implies(i, c, 0, 0) for c in self.zero_comparisons[i]):
+            comps = [c for c in self.zero_comparisons[i] if not implies(i, comp_negate(c), 0, 0)]
+            if len(comps) != len(self.zero_comparisons[i]):
+                self.zero_comparisons[i], changed = comps, True
+            if any(implies(i, c, 0, 0) for c in comps):
                 self.satisfied = True
-                return
-            if len(self.zero_comparisons[i]) == 0:
+                return True
+            if len(comps) == 0:
                 del self.zero_comparisons[i]
 
         for (j, k) in self.comparisons.keys():
          #(key for key in self.comparisons if key[0] == i or key[1] == i):
             if j == i or k == i:
-                self.update_on_indices(i, j, B)
+                changed = self.update_on_indices(i, j, B, implies) or changed
+        return changed
 
-    def update_on_indices(self, i, j, B):
+    def update_on_indices(self, i, j, B, implies=None):
         """
         Looks at all disjuncts involving indices i and j and sees if they are satisfied in B.
+        Optional implies is used in place of B.implies.
+        Returns True if the clause has changed.
         """
+        implies = implies or B.implies
+        changed = False
         if (i, j) in self.comparisons:
-            self.comparisons[i, j] = [(comp, coeff) for (comp, coeff) in self.comparisons[i, j]
-                                      if not B.implies(i, comp_negate(comp), coeff, j)]
-            if any(B.implies(i, comp, coeff, j) for (comp, coeff) in self.comparisons[i, j]):
+            comps = [(comp, coeff) for (comp, coeff) in self.comparisons[i, j]
+                     if not implies(i, comp_negate(comp), coeff, j)]
+            if len(comps) != len(self.comparisons[i, j]):
+                self.comparisons[i, j], changed = comps, True
+            if any(implies(i, comp, coeff, j) for (comp, coeff) in comps):
                 self.satisfied = True
-                return
-            if len(self.comparisons[i, j]) == 0:
+                return True
+            if len(comps) == 0:
                 del self.comparisons[i, j]
+        return changed
 
     def update(self, B):
+        """
+        Checks every disjunct against B. Returns True if the clause has changed.
+        """
+        changed = False
         for k in self.zero_comparisons.keys():
-            self.update_on_index(k, B)
+            changed = self.update_on_index(k, B) or changed
         for (i, j) in self.comparisons.keys():
-            self.update_on_indices(i, j, B)
+            changed = self.update_on_indices(i, j, B) or changed
+        return changed
 
 
 ####################################################################################################
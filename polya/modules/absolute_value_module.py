@@ -110,9 +110,8 @@ class AbsModule:
         timer.stop(timer.ABS)
 
     def get_split_weight(self, B):
-        inds = [i for i in range(B.num_terms) if (isinstance(B.term_defs[i], terms.FuncTerm)
-                                            and B.term_defs[i].func_name == 'abs' and
-                                            B.weak_sign(B.term_defs[i].args[0].term.index) == 0)]
+        inds = [i for i in B.func_terms.get('abs', ())
+                if B.weak_sign(B.term_defs[i].args[0].term.index) == 0]
         weights = []
         for i in inds:
             j = B.term_defs[i].args[0].term.index
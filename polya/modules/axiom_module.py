@@ -44,40 +44,54 @@ def reduce_term(term, env):
     """
     # TODO: this duplicates some functionality of Term.substitute(), but adds the check for UVars.
     # can we recover this some other way?
-    if isinstance(term, terms.STerm):
+    # Nothing to replace below this node: hand it back unchanged.
+    if term.free_uvars.isdisjoint(env):
+        if isinstance(term, terms.STerm):
+            return term, not term.free_uvars
+        return terms.STerm(1, term), not term.free_uvars
+
+    # Dispatch on the exact class first: this is the hot path of unification, and triggers are
+    # built from only a handful of term classes.
+    ttype = type(term)
+    if ttype is terms.STerm:
         l = reduce_term(term.term, env)
         return terms.STerm(term.coeff*l[0].coeff, l[0].term), l[1]
-    if isinstance(term, terms.UVar):
+    if ttype is terms.UVar:
         if term.index in env:
             c, j = env[term.index]
             return terms.STerm(c, terms.IVar(j)), True
         else:
             return terms.STerm(1, term), False
 
-    elif isinstance(term, terms.Atom):
-        return terms.STerm(1, term), True
-
-    elif isinstance(term, terms.AddTerm):
-        rfunc = lambda (s1, flag1), (s2, flag2): (s1+s2, flag1 and flag2)
-        t = reduce(rfunc, [(lambda a: (ap.coeff*a[0], a[1]))(reduce_term(ap.term, env))
-                           for ap in term.args])
-        return terms.STerm(1, t[0]), t[1]
-    elif isinstance(term, terms.MulTerm):
-        rfunc = lambda (s1, flag1), (s2, flag2): (s1*s2, flag1 and flag2)
-        t = reduce(rfunc, [(lambda a:(a[0]**mp.exponent, a[1]))(reduce_term(mp.term, env))
-                           for mp in term.args])
-        return terms.STerm(1, t[0]), t[1]
     elif isinstance(term, terms.FuncTerm):
         flag1 = True
         nargs = []
         for a in term.args:
-            t = reduce_term(a.term, env)
-            s, flag2 = t[0], t[1]
+            s, flag2 = reduce_term(a.term, env)
             nargs.append(a.coeff * s)
             flag1 = flag1 and flag2
         #return terms.STerm(1, terms.FuncTerm(term.func_name, nargs)), flag1
         return terms.STerm(1, term.func(*nargs)), flag1
 
+    elif isinstance(term, terms.Atom):
+        return terms.STerm(1, term), True
+
+    elif isinstance(term, terms.AddTerm):
+        flag1 = True
+        t = None
+        for ap in term.args:
+            s, flag2 = reduce_term(ap.term, env)
+            t = ap.coeff*s if t is None else t + ap.coeff*s
+            flag1 = flag1 and flag2
+        return terms.STerm(1, t), flag1
+    elif isinstance(term, terms.MulTerm):
+        flag1 = True
+        t = None
+        for mp in term.args:
+            s, flag2 = reduce_term(mp.term, env)
+            t = s**mp.exponent if t is None else t * s**mp.exponent
+            flag1 = flag1 and flag2
+        return terms.STerm(1, t), flag1
     else:
         raise Exception('Unknown term type encountered in reduce_term: ' + str(term))
 
@@ -147,7 +161,7 @@ def add_gauss_eq_elim(coeff, term, B):
         urow[i] = c
 
     mat = []
-    for tc in B.get_equalities():
+    for tc in B.iter_equalities():
         i, c = tc.term1.index, tc.term2.coeff
         j = (B.num_terms if c == 0 else tc.term2.term.index)
         row = [0]*(B.num_terms+1)
@@ -221,8 +235,9 @@ def mul_gauss_eq_elim(coeff, term, B):
     else:
         coeff = 1
 
-    if nt.key in B.term_names:
-        return coeff, B.term_names[nt.key].index
+    ind = B.term_names.get(nt.key)
+    if ind is not None:
+        return coeff, ind
 
     if all(B.implies(a.term.index, terms.NE, 0, 0) for a in nt.args):
         # we can do gaussian elim.
@@ -232,7 +247,7 @@ def mul_gauss_eq_elim(coeff, term, B):
         urow[0] = 1
 
         mat = []
-        for tc in (e for e in B.get_equalities() if e.term2.coeff != 0):
+        for tc in (e for e in B.iter_equalities() if e.term2.coeff != 0):
             i, c, j = tc.term1.index, tc.term2.coeff, tc.term2.term.index
             if B.implies(i, terms.NE, 0, 0):  # if ti != 0, then tj != 0
                 row = [0]*(B.num_terms+1)
@@ -301,6 +316,26 @@ def find_problem_term(B, term1):
     term is a Term such that all variable occurrences are IVars.
     returns (c, i) such that term = c*ti, or raises NoTermException.
 
+    Results, including failures, are cached by term key until the blackboard learns something new.
+    """
+    cache = B.memo_table('find_problem_term')
+    try:
+        val = cache[term1.key]
+    except KeyError:
+        try:
+            val = _find_problem_term(B, term1)
+        except NoTermException:
+            val = None
+        cache[term1.key] = val
+    if val is None:
+        raise NoTermException
+    return val
+
+
+def _find_problem_term(B, term1):
+    """
+    The uncached version of find_problem_term.
+
     if term1 is a FuncTerm, recursively find problem terms matching each of the arguments, then
     search for a problem term with the same function name whose arguments are equal to the arguments
     of term1.
@@ -309,7 +344,8 @@ def find_problem_term(B, term1):
     of the arguments, and performs FM elimination on equalities to see if their sum/product is equal
     to a problem term.
     """
-    messages.announce('    finding problem term:' + str(term1), messages.DEBUG)
+    if messages.visible(messages.DEBUG):
+        messages.announce('    finding problem term:' + str(term1), messages.DEBUG)
     sterm = term1.canonize()
     term, coeff = sterm.term, sterm.coeff
     if isinstance(term, terms.IVar):
@@ -320,34 +356,41 @@ def find_problem_term(B, term1):
         return coeff, ind
 
     if isinstance(term, terms.FuncTerm):
+        # If no problem term has the right shape, there is no need to look at the arguments.
+        cands = [i for i in B.func_terms.get(term.func_name, [])
+                 if len(B.func_args[i]) == len(term.args)]
+        if len(cands) == 0:
+            raise NoTermException
+
         nargs = [find_problem_term(B, p.term) for p in term.args]
         for i in range(len(nargs)):
             nargs[i] = (term.args[i].coeff*nargs[i][0], nargs[i][1])
 
-        for i in range(B.num_terms):
-            t = B.term_defs[i]
-            if (isinstance(t, terms.FuncTerm) and t.func_name == term.func_name
-               and len(t.args) == len(nargs)):
-                match = True
-                for k in range(len(t.args)):
-                    targ, uarg = (t.args[k].coeff, t.args[k].term.index), nargs[k]
-                    p = tuple(sorted((targ[1], uarg[1])))
-                    if targ == uarg:
+        nargs = tuple(nargs)
+        for i in cands:
+            targs = B.func_args[i]
+            if targs == nargs:
+                return coeff, i
+            match = True
+            for k in range(len(targs)):
+                targ, uarg = targs[k], nargs[k]
+                p = tuple(sorted((targ[1], uarg[1])))
+                if targ == uarg:
+                    continue
+                elif targ[1] == uarg[1]:
+                    if targ[1] in B.zero_equalities:
                         continue
-                    elif targ[1] == uarg[1]:
-                        if targ[1] in B.zero_equalities:
-                            continue
-                    elif p in B.equalities:
-                        c = B.equalities[p]
-                        if targ[1] < uarg[1]:
-                            c = fractions.Fraction(1, c)
-                        if uarg[0]*c == targ[0]:
-                            continue
-                    match = False
-                    break
-
-                if match:
-                    return coeff, i
+                elif p in B.equalities:
+                    c = B.equalities[p]
+                    if targ[1] < uarg[1]:
+                        c = fractions.Fraction(1, c)
+                    if uarg[0]*c == targ[0]:
+                        continue
+                match = False
+                break
+
+            if match:
+                return coeff, i
         raise NoTermException
 
     elif isinstance(term, terms.AddTerm):
@@ -359,24 +402,46 @@ def find_problem_term(B, term1):
     raise NoTermException
 
 
-def unify(B, termlist, uvars, arg_uvars, envs=list()):
+def chain_to_env(chain):
+    """
+    chain is either None or a triple (UVar index, (const, IVar index), chain).
+    Returns the map from UVar indices to (const, IVar index) pairs that chain represents.
+    """
+    env = {}
+    while chain is not None:
+        v, val, chain = chain
+        env[v] = val
+    return env
+
+
+def find_arg_position(termlist, v):
+    """
+    Finds the first term in termlist that is a FuncTerm with u_v alone as an argument.
+    Returns a tuple (function name, arity, argument index, coefficient) describing it.
+    """
+    for t in termlist:
+        if isinstance(t, terms.FuncTerm):
+            for ind in range(len(t.args)):
+                a = t.args[ind]
+                if isinstance(a.term, terms.UVar) and a.term.index == v:
+                    return t.func_name, len(t.args), ind, a.coeff
+    raise Exception('arg_uvars not set up right.' + str(termlist) + str(v))
+
+
+def unify(B, termlist, uvars, arg_uvars, chain=None):
     """
     Takes Terms s1...sn involving uvars u1...um
     arg_uvars is a subset of uvars: those that occur alone as function arguments in s1...sn.
-    Optional envs is a list of maps from UVar indices to (const, IVar index) pairs.
+    Optional chain holds the assignments made so far, as described in chain_to_env. Branches of
+    the search share their common assignments, and only completed assignments are turned into
+    maps.
     Returns a list of assignments under which each si is equal to a problem term in B.
     """
+    if messages.visible(messages.DEBUG):
+        messages.announce(' Unifying :' + str(termlist) + str(arg_uvars) + str(chain),
+                          messages.DEBUG)
 
-    def occurs_as_arg(term, varkey):
-        """
-        Returns true if term is a FuncTerm and var occurs alone as an argument.
-        """
-        if not isinstance(term, terms.FuncTerm):
-            return False
-        return any(a.term.key == varkey for a in term.args)
-
-    messages.announce(' Unifying :' + str(termlist) + str(arg_uvars) + str(envs),
-                      messages.DEBUG)
+    envs = [chain_to_env(chain)] if chain is not None else []
 
     if len(uvars) == 0:
         return envs
@@ -398,40 +463,56 @@ def unify(B, termlist, uvars, arg_uvars, envs=list()):
         return n_envs
 
     v = arg_uvars[0]
-    vkey = terms.UVar(v).key
-    try:
-        t = next(term for term in termlist if occurs_as_arg(term, vkey))
-    except StopIteration:
-        raise Exception('arg_uvars not set up right.'+str(termlist)+str(uvars)+str(arg_uvars))
-    ind = next(j for j in range(len(t.args)) if t.args[j].term.key == vkey)
-    c = t.args[ind].coeff
+    # The position is looked up in termlist itself: substitution and canonization can change the
+    # terms passed down, so a position found in the triggers may no longer be right.
+    func_name, arity, ind, c = find_arg_position(termlist, v)
 
     # we have: t = f(..., c*u_v, ...)
-    prob_f_terms = [i for i in range(B.num_terms) if
-                    (isinstance(B.term_defs[i], terms.FuncTerm)
-                     and B.term_defs[i].func_name == t.func_name
-                     and len(B.term_defs[i].args) == len(t.args))]
-
-    messages.announce('   probfterms:' + str(prob_f_terms), messages.DEBUG)
-
-    s = [(fractions.Fraction(B.term_defs[i].args[ind].coeff, c),
-          B.term_defs[i].args[ind].term.index) for i in prob_f_terms]
+    prob_f_terms = [i for i in B.func_terms.get(func_name, [])
+                    if len(B.func_args[i]) == arity]
+
+    if messages.visible(messages.DEBUG):
+        messages.announce('   probfterms:' + str(prob_f_terms), messages.DEBUG)
+
+    # argument coefficients are already Fractions, so there is nothing to divide when c is 1.
+    # Several problem terms can share the argument at position ind; each distinct pair leads to
+    # the same search below, so only the first occurrence is kept.
+    s, seen = [], set()
+    for i in prob_f_terms:
+        acoeff, aind = B.func_args[i][ind]
+        p = (acoeff if c == 1 else fractions.Fraction(acoeff, c), aind)
+        if p not in seen:
+            seen.add(p)
+            s.append(p)
     # s is a list of pairs (coeff, j) such that c*coeff*tj occurs as an argument to f in a pr. term
 
+    # Only the terms in which u_v occurs change from one candidate to the next. The others are
+    # passed down unchanged and shared by every branch.
+    uvs = [p.free_uvars for p in termlist]
+    try:
+        for k in (k for k in range(len(termlist)) if not uvs[k]):
+            find_problem_term(B, termlist[k])
+    except NoTermException:
+        return []
+
     nenvs = []
     for (coeff, j) in s:
         #new_terms = [p.substitute({vkey: coeff*terms.IVar(j)}) for p in termlist]
-        new_terms = [substitute(p, v, coeff, j) for p in termlist]
         closed_terms, open_terms = list(), list()
 
-        for (a, b) in new_terms:
-            if b:
-                closed_terms.append(a)
-            else:
-                open_terms.append(a)
+        for k in range(len(termlist)):
+            if v in uvs[k]:
+                a, b = substitute(termlist[k], v, coeff, j)
+                if b:
+                    closed_terms.append(a)
+                else:
+                    open_terms.append(a.term)
+            elif uvs[k]:
+                open_terms.append(termlist[k])
 
         try:
-            messages.announce('   closed terms:' + str(closed_terms), messages.DEBUG)
+            if messages.visible(messages.DEBUG):
+                messages.announce('   closed terms:' + str(closed_terms), messages.DEBUG)
             prob_terms = [find_problem_term(B, ct.term) for ct in closed_terms]
         except NoTermException:
 
@@ -440,58 +521,56 @@ def unify(B, termlist, uvars, arg_uvars, envs=list()):
         # TODO: prob_terms isn't actually used in what follows. Could it be?
 
         # At this point, every closed term matches something in the problem.
-        cenvs = copy.deepcopy(envs) if envs else [{}]
-        for c in cenvs:
-            c[v] = (coeff, j)
-            maps = unify(B, [o.term for o in open_terms],
-                         [v0 for v0 in uvars if v0 != v], arg_uvars[1:], cenvs)
-            nenvs.extend(maps)
+        nenvs.extend(unify(B, open_terms, [v0 for v0 in uvars if v0 != v], arg_uvars[1:],
+                           (v, (coeff, j), chain)))
 
     return nenvs
 
 
+def name_reduced_term(B, term, env):
+    """
+    Reduces term under env, and returns a pair (c, i) such that the result is equal to c*t_i.
+    Defines a new problem term if the result does not match an existing one.
+    """
+    red = reduce_term(term, env)[0].canonize()
+    try:
+        coeff, ind = find_problem_term(B, red.term)
+        if red.coeff != 1:
+            coeff *= red.coeff
+    except NoTermException:
+        coeff, ind = red.coeff, B.term_name(red.term).index
+    return coeff, ind
+
+
 def instantiate(axiom, used_envs, B):
     """
     Given an Axiom object, finds appropriate instantiations by unifying with B.
     Returns a list of clauses.
     """
     # Get a list of assignments that work for all of axiom's triggers.
-    envs = unify(B, axiom.triggers, list(axiom.vars), list(axiom.trig_arg_vars))
-    messages.announce(' Environments:', messages.DEBUG)
-    for e in envs:
-        messages.announce('  '+str(e), messages.DEBUG)
+    envs = unify(B, axiom.triggers, axiom.var_list, axiom.trig_arg_var_list)
+    if messages.visible(messages.DEBUG):
+        messages.announce(' Environments:', messages.DEBUG)
+        for e in envs:
+            messages.announce('  '+str(e), messages.DEBUG)
 
     # For each assignment, use it to instantiate a Clause from axiom and assert it in B.
     clauses = []
-    astr = str(axiom)
-    for env in [e for e in envs if (axiom, str(e)) not in used_envs]:
+    for env in envs:
+        key = (axiom, frozenset(env.items()))
+        if key in used_envs:
+            continue
         literals = []
-        for l in axiom.literals:
-            comp = l.comp
-            red = reduce_term(l.term1, env)[0].canonize()
-            red_coeff, red_term = red.coeff, red.term
-            try:
-                lcoeff, lterm = find_problem_term(B, red_term)
-                lcoeff *= red_coeff
-            except NoTermException:
-                lterm = B.term_name(red.term).index
-                lcoeff = red.coeff
-
-            red = reduce_term(l.term2.term, env)[0].canonize()
-            red_coeff, red_term = red.coeff, red.term
-            try:
-                rcoeff, rterm = find_problem_term(B, red.term)
-                rcoeff *= l.term2.coeff*red_coeff
-            except NoTermException:
-                #sred = red.canonize()
-                rterm = B.term_name(red.term).index
-                rcoeff = red.coeff * l.term2.coeff
-
+        for (comp, term1, coeff2, term2) in axiom.literal_parts:
+            lcoeff, lterm = name_reduced_term(B, term1, env)
+            rcoeff, rterm = name_reduced_term(B, term2, env)
+            if coeff2 != 1:
+                rcoeff *= coeff2
             literals.append(
                 terms.comp_eval[comp](lcoeff*terms.IVar(lterm), rcoeff*terms.IVar(rterm))
             )
         clauses.append(literals)
-        used_envs.add((axiom, str(env)))
+        used_envs.add(key)
     return clauses
 
 def instantiate_triggerless(axiom, used_envs, B):
@@ -527,7 +606,7 @@ def instantiate_triggerless(axiom, used_envs, B):
                 return False
 
     bd_clauses = {v: [l for l in axiom.literals if is_bd_lit(l, terms.UVar(v))] for v in axiom.vars}
-    if any(len(bd_clauses[k]) == 0 for k in bd_clauses.keys()):
+    if any(len(c) == 0 for c in bd_clauses.itervalues()):
         return []
 
     clauses = []
@@ -538,12 +617,13 @@ def instantiate_triggerless(axiom, used_envs, B):
         for (v, l) in assn:
             if l.term2.term.key == terms.UVar(v).key:
                 c, ind = find_problem_term(B, l.term1)
-                c *= fractions.Fraction(1, l.term2.coeff)
+                if l.term2.coeff != 1:
+                    c /= l.term2.coeff
             else:
                 c, ind = find_problem_term(B, l.term2.term)
                 c *= l.term2.coeff
             env[v] = (c, ind)
-        if (axiom, str(env)) in used_envs:
+        if (axiom, frozenset(env.items())) in used_envs:
             continue
         err = False
         for l in axiom.literals:
@@ -562,23 +642,22 @@ def instantiate_triggerless(axiom, used_envs, B):
                 break
         if not err:
             clauses.append(literals)
-            used_envs.add((axiom, str(env)))
+            used_envs.add((axiom, frozenset(env.items())))
     return clauses
 
 
 
 class AxiomModule:
 
-    def __init__(self, axioms=list()):
+    def __init__(self, axioms=None):
         """
         axioms is a list of Formula objects, that need to be converted into Axiom objects.
         """
         self.axioms = set()
-        for a in axioms:
+        for a in (axioms or []):
             clauses = formulas.cnf(a)
             self.axioms.update(formulas.Axiom(c) for c in clauses)
         self.used_envs = set()
-        self.num_eqs = 0
 
     def add_axiom(self, axiom):
         """
@@ -600,15 +679,18 @@ class AxiomModule:
         """
         timer.start(timer.FUN)
         messages.announce_module('axiom module')
-        n = B.num_terms + len(B.equalities.keys()) + len(B.zero_equalities)
-        #if n == self.num_eqs:
-        #    messages.announce("No new information for the axiom module to use.", messages.DEBUG)
-        #    timer.stop(timer.FUN)
-        #    return
-        self.num_eqs = n
+        # If B has not changed since this module last started on it, every instantiation it could
+        # find has already been used. The revision is read now rather than at the end, since the
+        # clauses asserted below can teach B facts that the earlier axioms have not seen.
+        revision = B.revision
+        if B.memo_table('axiom_module').get(id(self)) == (revision, len(self.axioms)):
+            messages.announce("No new information for the axiom module to use.", messages.DEBUG)
+            timer.stop(timer.FUN)
+            return
 
         for a in self.axioms:
-            messages.announce("Instantiating axiom: {}".format(a), messages.DEBUG)
+            if messages.visible(messages.DEBUG):
+                messages.announce("Instantiating axiom: {}".format(a), messages.DEBUG)
             if a.unifiable:
                 clauses = instantiate(a, self.used_envs, B)
                 for c in clauses:
@@ -617,6 +699,7 @@ class AxiomModule:
                 clauses = instantiate_triggerless(a, self.used_envs, B)
                 for c in clauses:
                     B.assert_clause(*c)
+        B.memo_table('axiom_module')[id(self)] = (revision, len(self.axioms))
         timer.stop(timer.FUN)
 
     def get_split_weight(self, B):
@@ -64,6 +64,13 @@ log_axioms = [
 ]
 
 
+# the order in which axioms are added, when several builtins appear at once
+builtin_order = ['sin', 'cos', 'tan', 'floor', 'abs', 'exp', 'log']
+builtin_axioms = {'sin': sin_axioms, 'cos': cos_axioms, 'tan': tan_axioms,
+                  'floor': floor_axioms, 'abs': abs_axioms, 'exp': exp_axioms,
+                  'log': log_axioms}
+
+
 class BuiltinsModule:
     def __init__(self, am):
         """
@@ -72,42 +79,21 @@ class BuiltinsModule:
         self.am = am
         self.added = {'sin': False, 'cos': False, 'tan': False, 'floor': False, 'abs': False,
                       'exp': False, 'log': False}
+        self.pending = list(builtin_order)  # builtins whose axioms have not been added yet
 
     def update_blackboard(self, B):
         """
         Adds axioms for sin, cos, tan, floor
         """
         timer.start(timer.BUILTIN)
-        ts = [B.term_defs[i] for i in range(B.num_terms)]
-        funcs = [t.func.name for t in ts if isinstance(t, terms.FuncTerm)]
-
-        if (not self.added['sin'] and 'sin' in funcs):
-            self.am.add_axioms(sin_axioms)
-            self.added['sin'] = True
-
-        if (not self.added['cos'] and 'cos' in funcs):
-            self.am.add_axioms(cos_axioms)
-            self.added['cos'] = True
-
-        if (not self.added['tan'] and 'tan' in funcs):
-            self.am.add_axioms(tan_axioms)
-            self.added['tan'] = True
-
-        if (not self.added['floor'] and 'floor' in funcs):
-            self.am.add_axioms(floor_axioms)
-            self.added['floor'] = True
-
-        if (not self.added['abs'] and 'abs' in funcs):
-            self.am.add_axioms(abs_axioms)
-            self.added['abs'] = True
-
-        if (not self.added['exp'] and 'exp' in funcs):
-            self.am.add_axioms(exp_axioms)
-            self.added['exp'] = True
-
-        if (not self.added['log'] and 'log' in funcs):
-            self.am.add_axioms(log_axioms)
-            self.added['log'] = True
+        funcs = B.func_terms
+        new_axioms = []
+        for f in [f for f in self.pending if f in funcs]:
+            new_axioms.extend(builtin_axioms[f])
+            self.added[f] = True
+            self.pending.remove(f)
+        if new_axioms:
+            self.am.add_axioms(new_axioms)
 
         timer.stop(timer.BUILTIN)
 
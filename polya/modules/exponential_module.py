@@ -47,8 +47,7 @@ def exp_factor_constant(B):
     Takes a Blackboard B. For each i,
     If B.term_defs[i] is of the form exp(c*t), will declare that it is equal to exp(t)**c
     """
-    exp_inds = [i for i in range(B.num_terms) if (isinstance(B.term_defs[i], terms.FuncTerm)
-                                                  and B.term_defs[i].func == terms.exp)]
+    exp_inds = [i for i in B.func_terms.get('exp', ()) if B.term_defs[i].func == terms.exp]
     for i in exp_inds:
         exponent = B.term_defs[i].args[0]
         if exponent.coeff != 1:
@@ -62,8 +61,7 @@ def log_factor_exponent(B):
     Takes a Blackboard B. Looks for terms of the form log(t**e), and asserts that they are equal to
     e*log(t).
     """
-    log_inds = [i for i in range(B.num_terms) if (isinstance(B.term_defs[i], terms.FuncTerm)
-                                                  and B.term_defs[i].func == terms.log)]
+    log_inds = [i for i in B.func_terms.get('log', ()) if B.term_defs[i].func == terms.log]
 
     for i in log_inds:
         coeff, t = B.term_defs[i].args[0].coeff, B.term_defs[B.term_defs[i].args[0].term.index]
@@ -82,8 +80,7 @@ def exp_factor_sum(B):
     exp(t_1)*exp(ct_2)*...
     """
 
-    exp_inds = [i for i in range(B.num_terms) if (isinstance(B.term_defs[i], terms.FuncTerm)
-                                                  and B.term_defs[i].func == terms.exp)]
+    exp_inds = [i for i in B.func_terms.get('exp', ()) if B.term_defs[i].func == terms.exp]
     for i in exp_inds:
         coeff, t = B.term_defs[i].args[0].coeff, B.term_defs[B.term_defs[i].args[0].term.index]
         if isinstance(t, terms.AddTerm) and coeff == 1:
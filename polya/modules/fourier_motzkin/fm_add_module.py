@@ -269,8 +269,8 @@ def get_additive_information(B):
     """
     Retrieves known additive comparisons and inequalities from the blackboard B.
     """
-    zero_equalities = [equality_to_zero_equality(c) for c in B.get_equalities()]
-    zero_comparisons = [inequality_to_zero_comparison(c) for c in B.get_inequalities()]
+    zero_equalities = [equality_to_zero_equality(c) for c in B.iter_equalities()]
+    zero_comparisons = [inequality_to_zero_comparison(c) for c in B.iter_inequalities()]
     # convert each definition ti = s0 + s1 + ... + sn to a zero equality
     for i in range(B.num_terms):
         if isinstance(B.term_defs[i], terms.AddTerm):
@@ -31,47 +31,89 @@ class MinimumModule:
         """
         messages.announce_module('minimum module')
         timer.start(timer.MINM)
-        for i in range(B.num_terms):
-            if isinstance(B.term_defs[i], terms.FuncTerm) and B.term_defs[i].func_name == 'minm':
-                # t_i is of the form minm(...)
-                args = B.term_defs[i].args
-                # assert that t_i is le all of its arguments
+        gt, ge, lt, le = terms.GT, terms.GE, terms.LT, terms.LE
+
+        def may_bound(j, args):
+            """
+            Returns False if c * t_j <= a is known for no c, for some a in args. This only looks
+            at which tables mention t_j, so it is cheaper than computing the range.
+            """
+            if j in B.zero_inequalities or j in B.zero_equalities:
+                return True
+            for a in args:
+                k = a.term.index
+                if a.coeff == 0:
+                    return False
+                if not (k == j or k in B.zero_inequalities or (j, k) in B.inequalities
+                        or (k, j) in B.inequalities or (j, k) in B.equalities
+                        or (k, j) in B.equalities):
+                    return False
+            return True
+
+        # the minm terms for which t_i <= a has been asserted for each argument a
+        bounded = B.module_table('minm_bounded')
+
+        # copy the list, since asserting comparisons can define new minm terms
+        for i in list(B.func_terms.get('minm', ())):
+            # t_i is of the form minm(...)
+            args = B.term_defs[i].args
+            if len(args) == 1:
+                # t_i is equal to its only argument, and the other modules take it from there
+                if i not in bounded:
+                    B.assert_comparison(B.ivars[i] == args[0])
+                    bounded[i] = True
+                continue
+            # assert that t_i is le all of its arguments. These stay known, so once is enough.
+            if i not in bounded:
                 for a in args:
-                    B.assert_comparison(terms.IVar(i) <= a)
-                # see if we can infer the sign
-                # TODO: optimize
-                if all(B.implies_comparison(a > 0) for a in args):
-                    B.assert_comparison(terms.IVar(i) > 0)
-                elif all(B.implies_comparison(a >= 0) for a in args):
-                    B.assert_comparison(terms.IVar(i) >= 0)
-                if any(B.implies_comparison(a < 0) for a in args):
-                    B.assert_comparison(terms.IVar(i) < 0)
-                elif any(B.implies_comparison(a <= 0) for a in args):
-                    B.assert_comparison(terms.IVar(i) <= 0)
-                # see if any multiple of another problem term is known to be less than all the
-                # arguments.
-                for j in range(B.num_terms):
-                    if  j != i:
-                        comp_range = geometry.ComparisonRange(geometry.neg_infty, geometry.infty,
-                                                              True, True, True)
-                        for a in args:
-                            new_comp_range = B.le_coeff_range(j, a.term.index, a.coeff)
-                            comp_range = comp_range & new_comp_range
-                            if comp_range.is_empty():
-                                break
-                        if not comp_range.is_empty():
-                            if comp_range.lower.type == geometry.VAL:
-                                c = comp_range.lower.val
-                                if comp_range.lower_strict:
-                                    B.assert_comparison(c * terms.IVar(j) < terms.IVar(i))
-                                else:
-                                    B.assert_comparison(c * terms.IVar(j) <= terms.IVar(i))
-                            if comp_range.upper.type == geometry.VAL:
-                                c = comp_range.upper.val
-                                if comp_range.upper_strict:
-                                    B.assert_comparison(c * terms.IVar(j) < terms.IVar(i))
-                                else:
-                                    B.assert_comparison(c * terms.IVar(j) <= terms.IVar(i))
+                    B.assert_comparison(B.ivars[i] <= a)
+                bounded[i] = True
+            # see if we can infer the sign, reading the sign of each argument off B once
+            all_pos = all_nonneg = True
+            any_neg = any_nonpos = False
+            for a in args:
+                if a.coeff == 0:
+                    all_pos = all_pos and B.implies_comparison(a > 0)
+                    all_nonneg = all_nonneg and B.implies_comparison(a >= 0)
+                    any_neg = any_neg or B.implies_comparison(a < 0)
+                    any_nonpos = any_nonpos or B.implies_comparison(a <= 0)
+                    continue
+                k, flip = a.term.index, a.coeff < 0
+                all_pos = all_pos and B.implies_zero_comparison(k, lt if flip else gt)
+                all_nonneg = all_nonneg and B.implies_zero_comparison(k, le if flip else ge)
+                any_neg = any_neg or B.implies_zero_comparison(k, gt if flip else lt)
+                any_nonpos = any_nonpos or B.implies_zero_comparison(k, ge if flip else le)
+            if all_pos:
+                B.assert_comparison(B.ivars[i] > 0)
+            elif all_nonneg:
+                B.assert_comparison(B.ivars[i] >= 0)
+            if any_neg:
+                B.assert_comparison(B.ivars[i] < 0)
+            elif any_nonpos:
+                B.assert_comparison(B.ivars[i] <= 0)
+            # see if any multiple of another problem term is known to be less than all the
+            # arguments.
+            for j in range(B.num_terms):
+                if j != i and may_bound(j, args):
+                    comp_range = geometry.full_range
+                    for a in args:
+                        new_comp_range = B.le_coeff_range(j, a.term.index, a.coeff)
+                        comp_range = comp_range & new_comp_range
+                        if comp_range.is_empty():
+                            break
+                    if not comp_range.is_empty():
+                        if comp_range.lower.type == geometry.VAL:
+                            c = comp_range.lower.val
+                            if comp_range.lower_strict:
+                                B.assert_comparison(c * B.ivars[j] < B.ivars[i])
+                            else:
+                                B.assert_comparison(c * B.ivars[j] <= B.ivars[i])
+                        if comp_range.upper.type == geometry.VAL:
+                            c = comp_range.upper.val
+                            if comp_range.upper_strict:
+                                B.assert_comparison(c * B.ivars[j] < B.ivars[i])
+                            else:
+                                B.assert_comparison(c * B.ivars[j] <= B.ivars[i])
         timer.stop(timer.MINM)
 
     def get_split_weight(self, B):
@@ -46,10 +46,12 @@ def get_vertices(comparison_matrix):
     return lrs.get_generators(comparison_matrix)
 
 
-def create_h_format_matrix(comparisons, num_vars):
+def create_h_format_rows(comparisons, num_vars):
     """
     comparisons is a list of TermComparisons.
     num_vars is the number of IVars defined.
+    Returns the lists of inequality rows and equality rows of the H-format matrix for the
+    comparisons, as described in get_vertices.
     """
 
     inequalities, equalities = [], []
@@ -92,6 +94,13 @@ def create_h_format_matrix(comparisons, num_vars):
     row[1] = 1
     inequalities.append(row)
 
+    return inequalities, equalities
+
+
+def h_format_matrix(inequalities, equalities):
+    """
+    Makes the cdd matrix with the given inequality and equality rows.
+    """
     matrix = cdd.Matrix(inequalities, number_type='fraction')
     matrix.rep_type = cdd.RepType.INEQUALITY
 
@@ -102,4 +111,49 @@ def create_h_format_matrix(comparisons, num_vars):
     #     print l
     # print "---"
 
-    return matrix
\ No newline at end of file
+    return matrix
+
+
+def create_h_format_matrix(comparisons, num_vars):
+    """
+    comparisons is a list of TermComparisons.
+    num_vars is the number of IVars defined.
+    """
+    inequalities, equalities = create_h_format_rows(comparisons, num_vars)
+    return h_format_matrix(inequalities, equalities)
+
+
+def get_vertices_of_rows(inequalities, equalities, num_vars):
+    """
+    Returns get_vertices(h_format_matrix(inequalities, equalities)), for rows over num_vars
+    IVars.
+    The terms whose columns are zero in every row are unconstrained, so their columns are left
+    out of the matrix given to lrs, which then works in fewer dimensions. Each of these terms
+    comes back as a line of the result, in the linear set.
+    """
+    rows = inequalities + equalities
+    used = [k for k in range(2, num_vars + 2) if any(row[k] != 0 for row in rows)]
+    if len(used) == num_vars:
+        return get_vertices(h_format_matrix(inequalities, equalities))
+
+    if used:
+        keep = [0, 1] + used
+        matrix = h_format_matrix([[row[k] for k in keep] for row in inequalities],
+                                 [[row[k] for k in keep] for row in equalities])
+        small_vertices, small_lin_set = get_vertices(matrix)
+    else:
+        # Nothing constrains any term, so the only ray is delta, and lrs is not needed.
+        keep, small_vertices, small_lin_set = [0, 1], [[0, 1]], []
+
+    vertices, lin_set = [], list(small_lin_set)
+    for v in small_vertices:
+        row = [0] * (num_vars + 2)
+        for k, val in zip(keep, v):
+            row[k] = val
+        vertices.append(row)
+    for k in sorted(set(range(2, num_vars + 2)) - set(used)):
+        row = [0] * (num_vars + 2)
+        row[k] = 1
+        lin_set.append(len(vertices))
+        vertices.append(row)
+    return vertices, lin_set
@@ -18,7 +18,6 @@ import itertools
 
 import polya.main.terms as terms
 import polya.main.messages as messages
-import polya.util.geometry as geo
 import polya.modules.polyhedron.lrs_polyhedron_util as lrs_util
 import polya.modules.polyhedron.lrs as lrs
 import polya.util.timer as timer
@@ -43,6 +42,34 @@ class VertexSetException(Exception):
 ####################################################################################################
 
 
+def side(p, q):
+    """
+    Returns the value of geo.line_of_point(p) at q: zero if q is on the line through the origin
+    and p, and otherwise positive or negative depending on which side of it q falls.
+    """
+    return p[1] * q[0] - p[0] * q[1]
+
+
+def direction(p, q):
+    """
+    Same as geo.line_of_point(p).get_direction(q): GT, EQ or LT by the sign of side(p, q).
+    """
+    v = side(p, q)
+    if v > 0:
+        return terms.GT
+    elif v < 0:
+        return terms.LT
+    else:
+        return terms.EQ
+
+
+def collinear_rays(p, q):
+    """
+    Same as geo.are_collinear_rays.
+    """
+    return side(p, q) == 0 and p[0] * q[0] >= 0 and p[1] * q[1] >= 0
+
+
 def get_boundary_vertices(vertices):
     """
     Takes a list of triples where the first two entries are (x,y) coordinates, and the third is
@@ -56,11 +83,13 @@ def get_boundary_vertices(vertices):
     if len(vertices) < 2:
         raise VertexSetException('Fewer than two vertices')
 
+    # The side tests below are those of geo.fall_on_same_side, done directly on the coordinates:
+    # q and r fall on the same side of the line through p when side(p, q) * side(p, r) >= 0.
+    # Since side(p, q) == -side(q, p), each vertex needs only its sides against b1 and b2.
     b1 = next(v for v in vertices)
-    l_b1 = geo.line_of_point(b1)
 
     try:
-        b2 = next(v for v in vertices if not geo.are_collinear_rays(b1, v))
+        b2 = next(v for v in vertices if not collinear_rays(b1, v))
     except StopIteration:
         # All vertices point in the same direction.
         if any(v[2] != 0 for v in vertices):
@@ -69,22 +98,33 @@ def get_boundary_vertices(vertices):
             s = (b1[0], b1[1], 0)
         return s, s
 
-    l_b2 = geo.line_of_point(b2)
+    s12 = side(b1, b2)
+    last_off_line = 0
     for v in vertices:
-        l_v = geo.line_of_point(v)
-        if geo.fall_on_same_side(l_v, [b1, b2]):
-            if not geo.fall_on_same_side(l_b1, [v, b2]):
-                b1, l_b1 = v, l_v
-            elif not geo.fall_on_same_side(l_b2, [v, b1]):
-                b2, l_b2 = v, l_v
-            elif v[2] != 0:
-                if geo.are_collinear_rays(b1, v):
-                    b1, l_b1 = v, l_v
-                elif geo.are_collinear_rays(b2, v):
-                    b2, l_b2 = v, l_v
-
-    if (not geo.fall_on_same_side(l_b1, vertices)) or (not geo.fall_on_same_side(l_b2, vertices)):
-        raise VertexSetException('Points not in semicircle.')
+        s1, s2 = side(v, b1), side(v, b2)
+        if s12 == 0 and s1 != 0:
+            # b1 and b2 are opposite, so no later vertex can move them off their line. Vertices
+            # on both sides of that line fail the semicircle test below, so fail now.
+            if s1 * last_off_line < 0:
+                raise VertexSetException('Points not in semicircle.')
+            last_off_line = s1
+        if s1 * s2 >= 0:
+            if s1 * s12 > 0:
+                b1 = v
+            elif s2 * s12 < 0:
+                b2 = v
+            elif v[2] != 0 and collinear_rays(b1, v):
+                b1 = v
+            elif v[2] != 0 and collinear_rays(b2, v):
+                b2 = v
+            else:
+                continue
+            s12 = side(b1, b2)
+
+    for b in b1, b2:
+        sides = [side(b, v) for v in vertices]
+        if min(sides) < 0 < max(sides):
+            raise VertexSetException('Points not in semicircle.')
 
     return b1, b2
 
@@ -96,6 +136,78 @@ def get_boundary_vertices(vertices):
 ####################################################################################################
 
 
+def adjust_strength(strong, comp):
+    if strong:
+        if comp == terms.GE:
+            return terms.GT
+        elif comp == terms.LE:
+            return terms.LT
+    else:
+        if comp == terms.GT:
+            return terms.GE
+        elif comp == terms.LT:
+            return terms.LE
+    return comp
+
+
+def get_pair_comparisons(t_i, t_j, i_j_vertices, weak):
+    """
+    Takes the IVars t_i and t_j, and the nonempty set of vertices of the polyhedron projected onto
+    their coordinates, as triples (c_i, c_j, delta). weak is True if the projection reaches the
+    origin with nonzero delta.
+    Returns the TermComparisons between t_i and t_j that follow.
+    This depends on nothing but its arguments, so the pairs can be handled in any order.
+    """
+    learned_comparisons = []
+
+    # Find the extremal vertices.
+    try:
+        bound1, bound2 = get_boundary_vertices(i_j_vertices)
+        #messages.announce('boundary vertices:'+str(bound1)+', '+str(bound2), messages.DEBUG)
+    except VertexSetException:  # Nothing we can learn for this i, j pair.
+        return learned_comparisons
+
+    # Now, all vertices lie in the same halfplane between bound1 and bound2.
+    strong1, strong2 = (not weak) and (bound1[2] == 0), (not weak) and (bound2[2] == 0)
+
+    # the same as geo.line_of_point(bound1) == geo.line_of_point(bound2)
+    if side(bound1, bound2) == 0:
+        if bound1[0]*bound2[0] >= 0 and bound1[1]*bound2[1] >= 0:
+            # the rays are collinear. Learn equality.
+            learned_comparisons.append(bound1[1] * t_i == bound1[0] * t_j)
+            if strong1 or strong2:
+                learned_comparisons.append(
+                    bound1[1] * t_i < bound1[0] * t_j
+                )
+
+        else:
+            #the rays are opposite. Figure out the comparison direction another way.
+            try:
+                pt = next(v for v in i_j_vertices if side(bound1, v) != 0)
+                dir1 = adjust_strength(strong1 and strong2, direction(bound1, pt))
+                learned_comparisons.append(
+                    terms.TermComparison(bound1[1] * t_i, dir1, bound1[0] * t_j)
+                )
+            except StopIteration:
+                # There is no direction information to be found: all vertices are collinear.
+                #continue
+                learned_comparisons.append(bound1[1]*t_i == bound1[0]*t_j)
+            #print '*** bound1 = ', bound1, pt, terms.comp_str[direction(bound1, pt)]
+
+    else:
+        # Otherwise, the points do not lie on the same line through the origin.
+        dir1 = adjust_strength(strong1, direction(bound1, bound2))
+        dir2 = adjust_strength(strong2, direction(bound2, bound1))
+        learned_comparisons.append(
+            terms.TermComparison(bound1[1] * t_i, dir1, bound1[0] * t_j)
+        )
+        learned_comparisons.append(
+            terms.TermComparison(bound2[1] * t_i, dir2, bound2[0] * t_j)
+        )
+    #messages.announce('Learned:'+str(learned_comparisons), messages.DEBUG)
+    return learned_comparisons
+
+
 def get_2d_comparisons(vertices, lin_set):
     """
     Takes a matrix of vertices. Each row is of the form
@@ -105,94 +217,57 @@ def get_2d_comparisons(vertices, lin_set):
     Returns all possible TermComparisons from the given vertices.
     """
 
-    def adjust_strength(strong, comp):
-        if strong:
-            if comp == terms.GE:
-                return terms.GT
-            elif comp == terms.LE:
-                return terms.LT
-        else:
-            if comp == terms.GT:
-                return terms.GE
-            elif comp == terms.LT:
-                return terms.LE
-        return comp
-
-    if all(v[1] == 0 for v in vertices):  # We have a degenerate system.
+    deltas = [v[1] for v in vertices]
+    if not any(deltas):  # We have a degenerate system.
         return [terms.IVar(0) == 0]
 
     learned_comparisons = []
 
+    # Each pair only looks at two coordinates of each vertex, so split the matrix into columns
+    # once: columns[i] holds the t_i coordinate of every vertex.
+    columns = zip(*vertices)[2:]
+    # Most vertices are 0 in most coordinates. nonzero_rows[i] holds the indices of the vertices
+    # where t_i is not 0, so a pair only visits the vertices that do not project to the origin.
+    nonzero_rows = [set([k for k, c in enumerate(col) if c != 0]) for col in columns]
+    # the vertices with a nonzero delta
+    delta_rows = set([k for k, d in enumerate(deltas) if d != 0])
+    # the pairs below share these, rather than each building its own
+    ivars = [terms.IVar(i) for i in range(len(columns))]
+    # The linear rows are lines rather than rays, so the negation of each is a vertex as well.
+    # These are the negated rows, split into columns in the same way.
+    lin_columns = [[-col[k] for k in lin_set] for col in columns]
+    lin_deltas = [deltas[k] for k in lin_set]
+
     # Look for comparisons between t_i and t_j by checking each vertex.
-    for (i, j) in itertools.combinations(range(len(vertices[0])-2), 2):
+    for (i, j) in itertools.combinations(range(len(columns)), 2):
         #messages.announce(
             #'Looking for comparisons between {0} and {1}'.format(i, j), messages.DEBUG)
 
-        i_j_vertices = set()
-        weak = False
-        for v in vertices:
-            if v[i+2] != 0 or v[j+2] != 0:
-                i_j_vertices.add((v[i+2], v[j+2], v[1]))
-            elif v[1] != 0:
-                #(c,0,0) is a vertex, so (c-epsilon,0,0) is reachable.
-                weak = True
-
-        for k in lin_set:
-            v = vertices[k]
-            if v[i+2] != 0 or v[j+2] != 0:
-                i_j_vertices.add((-v[i+2], -v[j+2], v[1]))
-
-        if (i, j) == (2, 4): messages.announce('vertices:'+str(i_j_vertices), messages.DEBUG)
-
-        if len(i_j_vertices) == 0:
-            learned_comparisons.extend([terms.IVar(i) == 0, terms.IVar(j) == 0])
+        rows = nonzero_rows[i] | nonzero_rows[j]
+        if not rows:
+            # Every vertex projects to the origin, so there is nothing to find but t_i = t_j = 0.
+            learned_comparisons.extend([ivars[i] == 0, ivars[j] == 0])
             continue
 
-        # Find the extremal vertices.
-        try:
-            bound1, bound2 = get_boundary_vertices(i_j_vertices)
-            #messages.announce('boundary vertices:'+str(bound1)+', '+str(bound2), messages.DEBUG)
-        except VertexSetException:  # Nothing we can learn for this i, j pair.
-            continue
-
-        # Now, all vertices lie in the same halfplane between bound1 and bound2.
-        strong1, strong2 = (not weak) and (bound1[2] == 0), (not weak) and (bound2[2] == 0)
-        l_b1, l_b2 = geo.line_of_point(bound1), geo.line_of_point(bound2)
-
-        if l_b1 == l_b2:
-            if bound1[0]*bound2[0] >= 0 and bound1[1]*bound2[1] >= 0:
-                # the rays are collinear. Learn equality.
-                learned_comparisons.append(bound1[1] * terms.IVar(i) == bound1[0] * terms.IVar(j))
-                if strong1 or strong2:
-                    learned_comparisons.append(
-                        bound1[1] * terms.IVar(i) < bound1[0] * terms.IVar(j)
-                    )
+        col_i, col_j = columns[i], columns[j]
+        # The points are plain tuples (c_i, c_j, delta): in CPython 2 these are cheaper to build,
+        # hash and index than namedtuples or objects with __slots__.
+        # Many vertices project to the same point; building the set in one call drops those
+        # without an add for each. A set iterates in hash-slot order, not insertion order, but
+        # the points still go in in vertex order, as before. That reproduces the same set
+        # layout, and with it the tie-breaking in get_boundary_vertices.
+        i_j_vertices = set([(col_i[k], col_j[k], deltas[k]) for k in sorted(rows)])
+        #(c,0,0) is a vertex, so (c-epsilon,0,0) is reachable.
+        # This holds when some vertex with a nonzero delta projects to the origin.
+        weak = not delta_rows <= rows
+
+        for v in zip(lin_columns[i], lin_columns[j], lin_deltas):
+            if v[0] != 0 or v[1] != 0:
+                i_j_vertices.add(v)
 
-            else:
-                #the rays are opposite. Figure out the comparison direction another way.
-                try:
-                    pt = next(v for v in i_j_vertices if not l_b1.get_direction(v) == terms.EQ)
-                    dir1 = adjust_strength(strong1 and strong2, l_b1.get_direction(pt))
-                    learned_comparisons.append(
-                        terms.comp_eval[dir1](bound1[1] * terms.IVar(i), bound1[0] * terms.IVar(j))
-                    )
-                except StopIteration:
-                    # There is no direction information to be found: all vertices are collinear.
-                    #continue
-                    learned_comparisons.append(bound1[1]*terms.IVar(i) == bound1[0]*terms.IVar(j))
-                #print '*** l_b1 = ', l_b1, pt, terms.comp_str[l_b1.get_direction(pt)]
+        if (i, j) == (2, 4): messages.announce('vertices:'+str(i_j_vertices), messages.DEBUG)
 
-        else:
-            # Otherwise, the points do not lie on the same line through the origin.
-            dir1 = adjust_strength(strong1, l_b1.get_direction(bound2))
-            dir2 = adjust_strength(strong2, l_b2.get_direction(bound1))
-            learned_comparisons.append(
-                terms.comp_eval[dir1](bound1[1] * terms.IVar(i), bound1[0] * terms.IVar(j))
-            )
-            learned_comparisons.append(
-                terms.comp_eval[dir2](bound2[1] * terms.IVar(i), bound2[0] * terms.IVar(j))
-            )
-        #messages.announce('Learned:'+str(learned_comparisons), messages.DEBUG)
+        learned_comparisons.extend(get_pair_comparisons(ivars[i], ivars[j], i_j_vertices, weak))
     return learned_comparisons
 
 
@@ -202,13 +277,17 @@ def get_additive_information(B):
     """
     comparisons = B.get_inequalities() + B.get_equalities()
 
-    for key in B.term_defs:
+    # Term definitions never change, so the equations for the sums are built once per term.
+    defs = B.module_table('poly_add_definitions')
+    def_comparisons = defs.setdefault('comparisons', [])
+    for key in range(defs.get('num_terms', 0), B.num_terms):
         if isinstance(B.term_defs[key], terms.AddTerm):
-            comparisons.append(
-                terms.TermComparison(B.term_defs[key], terms.EQ, terms.IVar(key))
+            def_comparisons.append(
+                terms.TermComparison(B.term_defs[key], terms.EQ, B.ivars[key])
             )
+    defs['num_terms'] = B.num_terms
 
-    return comparisons
+    return comparisons + def_comparisons
 
 
 class PolyAdditionModule:
@@ -222,26 +301,42 @@ class PolyAdditionModule:
         """
         timer.start(timer.PADD)
         messages.announce_module('polyhedron additive module')
+        # If B has not changed since this module last started on it, lrs would find the same
+        # vertices, and everything they imply has already been asserted. The revision is read now
+        # rather than at the end, since asserting the comparisons below can teach B more facts.
+        revision = B.revision
+        if B.module_table('poly_add_module').get(id(self)) == revision:
+            messages.announce("No new information for the polyhedron additive module to use.",
+                              messages.DEBUG)
+            timer.stop(timer.PADD)
+            return
 
     #    learn_additive_sign_info(blackboard)
 
         comparisons = get_additive_information(B)
 
-        h_matrix = lrs_util.create_h_format_matrix(comparisons, B.num_terms)
-        messages.announce('Halfplane matrix:', messages.DEBUG)
-        messages.announce(h_matrix, messages.DEBUG)
-        v_matrix, v_lin_set = lrs_util.get_vertices(h_matrix)
-        messages.announce('Vertex matrix:', messages.DEBUG)
-        #messages.announce(str(v_matrix), messages.DEBUG)
-        for l in v_matrix:
-            messages.announce(str(l), messages.DEBUG)
-        messages.announce('Linear set:', messages.DEBUG)
-        messages.announce(str(v_lin_set), messages.DEBUG)
+        inequalities, equalities = lrs_util.create_h_format_rows(comparisons, B.num_terms)
+        if messages.visible(messages.DEBUG):
+            messages.announce('Halfplane matrix:', messages.DEBUG)
+            for l in inequalities:
+                messages.announce(str(l), messages.DEBUG)
+            messages.announce('Halfplane equalities:', messages.DEBUG)
+            for l in equalities:
+                messages.announce(str(l), messages.DEBUG)
+        # Terms that no comparison mentions are left out of the lrs call.
+        v_matrix, v_lin_set = lrs_util.get_vertices_of_rows(inequalities, equalities,
+                                                            B.num_terms)
+        if messages.visible(messages.DEBUG):
+            messages.announce('Vertex matrix:', messages.DEBUG)
+            for l in v_matrix:
+                messages.announce(str(l), messages.DEBUG)
+            messages.announce('Linear set:', messages.DEBUG)
+            messages.announce(str(v_lin_set), messages.DEBUG)
 
         new_comparisons = get_2d_comparisons(v_matrix, v_lin_set)
 
-        for c in new_comparisons:
-            B.assert_comparison(c)
+        B.assert_comparisons(*new_comparisons)
+        B.module_table('poly_add_module')[id(self)] = revision
 
         timer.stop(timer.PADD)
 
@@ -212,11 +212,12 @@ class PolyMultiplicationModule:
         messages.announce('Halfplane matrix:', messages.DEBUG)
         messages.announce(h_matrix, messages.DEBUG)
         v_matrix, v_lin_set = lrs_util.get_vertices(h_matrix)
-        messages.announce('Vertex matrix:', messages.DEBUG)
-        for l in v_matrix:
-            messages.announce(str(l), messages.DEBUG)
-        messages.announce('Linear set:', messages.DEBUG)
-        messages.announce(str(v_lin_set), messages.DEBUG)
+        if messages.visible(messages.DEBUG):
+            messages.announce('Vertex matrix:', messages.DEBUG)
+            for l in v_matrix:
+                messages.announce(str(l), messages.DEBUG)
+            messages.announce('Linear set:', messages.DEBUG)
+            messages.announce(str(v_lin_set), messages.DEBUG)
 
         new_comparisons = get_mul_comparisons(v_matrix, v_lin_set,
                                               B.num_terms, prime_of_index)
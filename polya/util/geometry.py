@@ -114,17 +114,9 @@ def fall_on_same_side(line, points):
     points is a list of pairs
     returns true if all points are (weakly) on the same side of line.
     """
-    eq_line = Line(line.a, line.b, line.c, terms.EQ)
-    try:
-        test_point = next(p for p in points if not eq_line.satisfies_point(p))
-    except StopIteration:  # All points lie on line.
-        return True
-
-    direction = Line(line.a, line.b, line.c, terms.GE)
-    if not direction.satisfies_point(test_point):
-        direction = Line(line.a, line.b, line.c, terms.LE)
-
-    return all(direction.satisfies_point(p) for p in points)
+    a, b, c = line.a, line.b, line.c
+    vals = [a * p[0] + b * p[1] - c for p in points]
+    return not vals or not min(vals) < 0 < max(vals)
 
 
 def are_collinear_rays(p1, p2):
@@ -141,7 +133,7 @@ def find_two_strongest(lines):
     return l1, l2
 
 
-class Halfplane:
+class Halfplane(object):
     """
     Defines the halfplane counterclockwise of the vector (a, b).
     If strong is true, the line bx - ay = 0 is not included in the halfplane.
@@ -149,6 +141,16 @@ class Halfplane:
 
     def __init__(self, a, b, strong):
         self.a, self.b, self.strong = a, b, strong
+        self._ratio = None
+
+    @property
+    def ratio(self):
+        """
+        Returns a / b, computed on first use. Assumes b != 0.
+        """
+        if self._ratio is None:
+            self._ratio = self.a / self.b
+        return self._ratio
 
     def __str__(self):
         return "({0}, {1}), {2}".format(self.a, self.b, "strong" if self.strong else "weak")
@@ -240,32 +242,51 @@ def halfplane_of_comp(comp, coeff):
         return Halfplane(-coeff, -1, (True if comp in [terms.GT, terms.LT] else False))
 
 
+# Halfplanes returned by query_halfplane_of_comp, keyed by (comp, coeff)
+query_halfplanes = {}
+query_halfplanes_max = 2000
+
+
+def query_halfplane_of_comp(comp, coeff):
+    """
+    Like halfplane_of_comp, but the halfplane returned is shared between calls. It is meant for
+    queries, and must not be stored or modified.
+    """
+    key = (comp, coeff)
+    hp = query_halfplanes.get(key)
+    if hp is None:
+        if len(query_halfplanes) >= query_halfplanes_max:
+            query_halfplanes.clear()
+        hp = query_halfplanes[key] = halfplane_of_comp(comp, coeff)
+    return hp
+
+
 def add_halfplane_comparison(hp, hp_list):
     """
-    Takes a new half plane comparison, and return a list of 0, 1, or 2 half plane comparisons,
+    Takes a new half plane comparison, and a tuple of 0, 1, or 2 half plane comparisons,
     assumed not to be equidirectional with the new one.
-    Returns a list with the strongest comparisons, taking new one into account.
+    Returns a tuple with the strongest comparisons, taking new one into account.
     """
 
     if len(hp_list) < 2:
-        return hp_list + [hp]
+        return tuple(hp_list) + (hp,)
     else:
         if hp.compare_hp(hp_list[0]) == -1:
             if hp.compare_hp(hp_list[1]) == -1:
                 # hp is counterclockwise from both
                 if hp_list[0].compare_hp(hp_list[1]) == -1:
-                    return [hp, hp_list[1]]
+                    return hp, hp_list[1]
                 else:
-                    return [hp, hp_list[0]]
+                    return hp, hp_list[0]
             else:
                 return hp_list
         else:
             if hp.compare_hp(hp_list[1]) == 1:
                 # hp is clockwise from both
                 if hp_list[0].compare_hp(hp_list[1]) == 1:
-                    return [hp_list[1], hp]
+                    return hp_list[1], hp
                 else:
-                    return [hp_list[0], hp]
+                    return hp_list[0], hp
             else:
                 return hp_list
 
@@ -365,6 +386,13 @@ class ComparisonRange:
         return self.__str__()
 
     def __and__(self, other):
+        # Every c gives a strict comparison in full_range, so intersecting with it leaves the other
+        # range as it is. (The general case below may weaken the interior tag of a single point,
+        # which is not used.)
+        if self is full_range:
+            return other
+        elif other is full_range:
+            return self
 
         if (self.upper < self.lower or other.upper < other.lower or self.upper < other.lower or
            other.upper < self.lower):
@@ -424,3 +452,34 @@ class ComparisonRange:
                                    self.interior_strict, self.lower_strict)
 
 empty_range = ComparisonRange(Extended(0), Extended(-1), False, False, False)
+full_range = ComparisonRange(neg_infty, infty, True, True, True)
+
+
+def halfplanes_range(hp_comps, d, interior_strong):
+    """
+    Takes the at most two strongest halfplane comparisons between ti and tj, and d = 1 or -1.
+    Returns the range of c for which ti <= c * tj is known if d == 1, or ti >= c * tj if d == -1.
+    interior_strong says whether the comparison is strict for c between the bounds.
+    """
+    if len(hp_comps) == 0:
+        return empty_range
+    if len(hp_comps) == 1:
+        hp = hp_comps[0]
+        if d * hp.b <= 0:
+            return empty_range
+        coeff = Extended(hp.ratio)
+        return ComparisonRange(coeff, coeff, hp.strong, hp.strong, hp.strong)
+
+    hp0, hp1 = hp_comps[0], hp_comps[1]
+    if hp0.compare_hp(hp1) == 1:
+        hp0, hp1 = hp1, hp0
+    open0, open1 = d * hp0.b <= 0, d * hp1.b <= 0
+    if open0 and open1:
+        return empty_range
+    elif open0:
+        return ComparisonRange(neg_infty, Extended(hp1.ratio), True, interior_strong, hp1.strong)
+    elif open1:
+        return ComparisonRange(Extended(hp0.ratio), infty, hp0.strong, interior_strong, True)
+    else:
+        return ComparisonRange(Extended(hp0.ratio), Extended(hp1.ratio),
+                               hp0.strong, interior_strong, hp1.strong)
@@ -3,6 +3,7 @@ import polya.util.num_util as num_util
 import fractions
 import math
 import copy
+import itertools
 
 ####################################################################################################
 #
@@ -239,7 +240,7 @@ def get_multiplicative_information(B):
     """
 
     comparisons = []
-    for c in (c for c in B.get_inequalities() + B.get_equalities()
+    for c in (c for c in itertools.chain(B.iter_inequalities(), B.iter_equalities())
               if c.term2.coeff != 0):
         ind1 = c.term1.index
         ind2 = c.term2.term.index
@@ -355,7 +356,7 @@ def preprocess_cancellations(B):
                 for i in range(len(B.term_defs)) if isinstance(B.term_defs[i],terms.MulTerm)}
     comps = []
 
-    for c in (c for c in B.get_inequalities() + B.get_equalities() if
+    for c in (c for c in itertools.chain(B.iter_inequalities(), B.iter_equalities()) if
             (c.term2.coeff != 0 and (c.term1.index in mul_inds or c.term2.term.index in mul_inds))):
         lterm = mul_inds[c.term1.index] if c.term1.index in mul_inds else c.term1
         rterm = mul_inds[c.term2.term.index] if c.term2.term.index in mul_inds else c.term2.term